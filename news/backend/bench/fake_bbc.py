@@ -0,0 +1,108 @@
+"""本地BBC替身服务器。
+
+提供录制的BBC首页、栏目页、RSS和文章页面，可配置响应延迟，
+用于在不访问bbc.com的情况下测试BBCCrawler和ArticleFetcher的性能。
+
+用法:
+    python -m bench.fake_bbc --port 8801 --latency-ms 200
+"""
+import argparse
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+
+class FakeBBCHandler(BaseHTTPRequestHandler):
+    """按路径返回固定页面：/news/articles/* 为文章页，*.xml 为RSS，其余 /news* 为首页/栏目页。"""
+
+    fixtures_dir: Path = FIXTURES_DIR
+    latency_ms: float = 0
+    jitter_ms: float = 0
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path.startswith("/news/articles/"):
+            # 优先返回与文章ID同名的录制页面，没有则使用通用文章页
+            name = path.rstrip("/").rsplit("/", 1)[-1]
+            fixture = self.fixtures_dir / "articles" / f"{name}.html"
+            if not fixture.exists():
+                fixture = self.fixtures_dir / "article.html"
+            content_type = "text/html; charset=utf-8"
+        elif path.endswith(".xml"):
+            fixture = self.fixtures_dir / "rss.xml"
+            content_type = "application/rss+xml; charset=utf-8"
+        elif path.startswith("/news"):
+            fixture = self.fixtures_dir / "homepage.html"
+            content_type = "text/html; charset=utf-8"
+        else:
+            self.send_error(404)
+            return
+
+        delay = self.latency_ms + random.uniform(0, self.jitter_ms)
+        if delay:
+            time.sleep(delay / 1000)
+
+        body = fixture.read_bytes()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """关闭逐请求日志，避免影响基准测试。"""
+
+
+def start_server(
+    port: int = 0,
+    latency_ms: float = 0,
+    jitter_ms: float = 0,
+    fixtures_dir: Optional[Path] = None
+) -> ThreadingHTTPServer:
+    """在后台线程中启动服务器。
+
+    Args:
+        port: 监听端口，0表示随机端口。
+        latency_ms: 每个请求的固定延迟（毫秒）。
+        jitter_ms: 在固定延迟基础上增加的随机延迟上限（毫秒）。
+        fixtures_dir: 可选，页面目录，默认为bench/fixtures。
+
+    Returns:
+        ThreadingHTTPServer: 服务器实例，server_address[1]为实际端口。
+    """
+    handler = type("Handler", (FakeBBCHandler,), {
+        "latency_ms": latency_ms,
+        "jitter_ms": jitter_ms,
+        "fixtures_dir": Path(fixtures_dir or FIXTURES_DIR),
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    """命令行入口。"""
+    parser = argparse.ArgumentParser(description="本地BBC替身服务器")
+    parser.add_argument("--port", type=int, default=8801)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES_DIR)
+    args = parser.parse_args()
+
+    server = start_server(args.port, args.latency_ms, args.jitter_ms, args.fixtures)
+    print(f"BBC替身服务器运行在 http://127.0.0.1:{server.server_address[1]}/news")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""本地OpenAI兼容LLM替身服务器。
+
+实现 /chat/completions 接口（含流式SSE），可配置首字延迟和生成速度，
+用于在不调用DashScope的情况下测试Translator和Polisher的性能。
+按字符数粗略估算token数，usage字段格式与OpenAI一致。
+
+用法:
+    python -m bench.fake_llm --port 8802 --ttft-ms 300 --tokens-per-sec 80
+    DASHSCOPE_BASE_URL=http://127.0.0.1:8802/v1 python -m src.ai.translator "Hello"
+"""
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 粗略估算：平均每个token约对应的字符数
+CHARS_PER_TOKEN = 4
+# 每个流式分片包含的token数
+TOKENS_PER_CHUNK = 4
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    """模拟chat.completions：输出长度与输入长度成比例，延迟=首字延迟+输出token数/生成速度。"""
+
+    ttft_ms: float = 200
+    tokens_per_sec: float = 100
+    output_ratio: float = 1.0
+    # 与DashScope一致：qwen-mt系列的流式输出为非增量式，每个分片都是截至目前的完整结果
+    non_incremental_prefixes = ("qwen-mt",)
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        messages = request.get("messages", [])
+        prompt = "".join(m.get("content") or "" for m in messages)
+        prompt_tokens = max(1, len(prompt) // CHARS_PER_TOKEN)
+
+        completion_tokens = max(1, int(prompt_tokens * self.output_ratio))
+        if request.get("max_tokens"):
+            completion_tokens = min(completion_tokens, int(request["max_tokens"]))
+        # 每个token输出一个中文字符，便于和输入长度对照
+        text = ("模拟译文" * (completion_tokens // 4 + 1))[:completion_tokens]
+
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        model = request.get("model", "fake")
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+
+        time.sleep(self.ttft_ms / 1000)
+        if request.get("stream"):
+            self._stream(completion_id, model, text, usage, request.get("stream_options") or {})
+        else:
+            time.sleep(completion_tokens / self.tokens_per_sec)
+            self._send_json({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            })
+
+    def _stream(self, completion_id: str, model: str, text: str, usage: dict, stream_options: dict) -> None:
+        """以SSE格式逐片输出。"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        def _chunk(delta: dict, finish_reason=None, chunk_usage=None, choices=True):
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if choices else [],
+            }
+            if chunk_usage:
+                payload["usage"] = chunk_usage
+            self.wfile.write(f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        incremental = not model.startswith(self.non_incremental_prefixes)
+        _chunk({"role": "assistant", "content": ""})
+        for start in range(0, len(text), TOKENS_PER_CHUNK):
+            piece = text[start:start + TOKENS_PER_CHUNK]
+            _chunk({"content": piece if incremental else text[:start + TOKENS_PER_CHUNK]})
+            time.sleep(len(piece) / self.tokens_per_sec)
+        _chunk({}, finish_reason="stop")
+        if stream_options.get("include_usage"):
+            _chunk({}, chunk_usage=usage, choices=False)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def _send_json(self, payload: dict) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """关闭逐请求日志，避免影响基准测试。"""
+
+
+def start_server(
+    port: int = 0,
+    ttft_ms: float = 200,
+    tokens_per_sec: float = 100,
+    output_ratio: float = 1.0
+) -> ThreadingHTTPServer:
+    """在后台线程中启动服务器。
+
+    Args:
+        port: 监听端口，0表示随机端口。
+        ttft_ms: 首字延迟（毫秒）。
+        tokens_per_sec: 生成速度（token/秒）。
+        output_ratio: 输出token数与输入token数之比。
+
+    Returns:
+        ThreadingHTTPServer: 服务器实例，server_address[1]为实际端口。
+    """
+    handler = type("Handler", (FakeLLMHandler,), {
+        "ttft_ms": ttft_ms,
+        "tokens_per_sec": tokens_per_sec,
+        "output_ratio": output_ratio,
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    """命令行入口。"""
+    parser = argparse.ArgumentParser(description="本地OpenAI兼容LLM替身服务器")
+    parser.add_argument("--port", type=int, default=8802)
+    parser.add_argument("--ttft-ms", type=float, default=200)
+    parser.add_argument("--tokens-per-sec", type=float, default=100)
+    parser.add_argument("--output-ratio", type=float, default=1.0)
+    args = parser.parse_args()
+
+    server = start_server(args.port, args.ttft_ms, args.tokens_per_sec, args.output_ratio)
+    print(f"LLM替身服务器运行在 http://127.0.0.1:{server.server_address[1]}/v1")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
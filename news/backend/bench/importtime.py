@@ -0,0 +1,129 @@
+"""进程启动耗时基准测试。
+
+用 python -X importtime 在全新子进程中导入命令行、API和工作进程的入口模块，
+统计导入总耗时、进程总耗时和最耗时的模块，用于发现被提前导入的重量级依赖。
+批量任务和离线重新解析会启动大量短生命周期的工作进程，启动耗时直接影响吞吐。
+
+用法（在backend目录下运行）:
+    python -m bench.importtime all
+    python -m bench.importtime cli worker --repeat 10 --top 15
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# 测试项 -> 入口模块
+TARGETS = {
+    "cli": "src.pipeline",
+    "api": "src.api",
+    "worker": "src.batch",
+    "database": "models.database",
+}
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """解析 -X importtime 的输出。
+
+    Args:
+        stderr: 子进程的标准错误输出。
+
+    Returns:
+        List[Dict]: 每个模块的self_us、cumulative_us、depth和name。
+    """
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        stripped = name.lstrip()
+        modules.append({
+            "name": stripped,
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+            # 缩进每两个空格表示一层嵌套导入
+            "depth": (len(name) - len(stripped) - 1) // 2,
+        })
+    return modules
+
+
+def measure(module: str) -> Dict:
+    """在全新子进程中导入模块一次，返回导入耗时、进程耗时和模块列表。"""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - start
+    modules = parse_importtime(proc.stderr)
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "未知错误"
+        raise RuntimeError(f"导入 {module} 失败: {error}")
+
+    top_level = [m for m in modules if m["name"] == module and m["depth"] == 0]
+    return {
+        "import_ms": top_level[-1]["cumulative_us"] / 1000 if top_level else 0.0,
+        "process_ms": wall * 1000,
+        "module_count": len(modules),
+        "modules": modules,
+    }
+
+
+def run_target(name: str, repeat: int, top: int) -> Dict:
+    """多次测量同一入口，取中位数，并列出最后一次测量中自身耗时最多的模块。"""
+    module = TARGETS[name]
+    runs = [measure(module) for _ in range(repeat)]
+    heaviest = sorted(runs[-1]["modules"], key=lambda m: m["self_us"], reverse=True)[:top]
+    return {
+        "name": name,
+        "module": module,
+        "import_ms": statistics.median(r["import_ms"] for r in runs),
+        "process_ms": statistics.median(r["process_ms"] for r in runs),
+        "module_count": runs[-1]["module_count"],
+        "heaviest": [{"name": m["name"], "self_ms": m["self_us"] / 1000} for m in heaviest],
+    }
+
+
+def print_table(results: List[Dict]) -> None:
+    """以表格形式打印结果。"""
+    print(f"{'入口':<10}{'模块':<20}{'导入(ms)':>10}{'进程(ms)':>10}{'模块数':>8}")
+    for r in results:
+        print(f"{r['name']:<10}{r['module']:<20}{r['import_ms']:>10.1f}{r['process_ms']:>10.1f}{r['module_count']:>8}")
+    for r in results:
+        print(f"\n{r['name']} 自身导入耗时最多的模块:")
+        for m in r["heaviest"]:
+            print(f"  {m['self_ms']:>8.1f} ms  {m['name']}")
+
+
+def main():
+    """命令行入口。"""
+    parser = argparse.ArgumentParser(description="进程启动耗时基准测试")
+    parser.add_argument("targets", nargs="+", choices=list(TARGETS) + ["all"])
+    parser.add_argument("--repeat", type=int, default=5, help="每个入口的测量次数，取中位数")
+    parser.add_argument("--top", type=int, default=10, help="列出自身耗时最多的模块数量")
+    parser.add_argument("--json", action="store_true", help="以JSON格式输出结果")
+    args = parser.parse_args()
+
+    targets = list(TARGETS) if "all" in args.targets else args.targets
+    results: List[Dict] = []
+    for target in targets:
+        print(f"测量 {target} ...", file=sys.stderr)
+        try:
+            results.append(run_target(target, args.repeat, args.top))
+        except RuntimeError as e:
+            print(e, file=sys.stderr)
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+    else:
+        print_table(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""离线端到端基准测试。
+
+使用本地BBC替身服务器和LLM替身服务器，测量BBCCrawler、ArticleFetcher、
+Translator、Polisher和Database的p50/p95延迟、吞吐量和峰值内存，不访问外部网络。
+每个测试项在独立子进程中运行，峰值内存互不影响；子进程使用临时数据库，不写入正式数据。
+
+用法（在backend目录下运行）:
+    python -m bench.run_bench all
+    python -m bench.run_bench translator polisher --iterations 20 --concurrency 4 --ttft-ms 300
+    python -m bench.run_bench database --sizes 1000,100000,1000000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from bench import fake_bbc, fake_llm
+
+TARGETS = ["crawler", "fetcher", "translator", "polisher", "database"]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """最近秩法计算百分位数。"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def peak_rss_mb() -> float:
+    """返回当前进程的峰值常驻内存（MB）。"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux单位为KB，macOS单位为字节
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def summarize(name: str, latencies: List[float], wall: float, items: int) -> Dict:
+    """汇总一组耗时（秒）为结果字典。"""
+    return {
+        "name": name,
+        "count": len(latencies),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "throughput": items / wall if wall else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_concurrent(fn: Callable[[int], int], iterations: int, concurrency: int) -> tuple:
+    """在线程池中并发调用fn(i)，返回(每次耗时列表, 总耗时, 处理条数)。"""
+    latencies: List[float] = []
+
+    def _timed(i: int) -> int:
+        start = time.perf_counter()
+        n = fn(i)
+        latencies.append(time.perf_counter() - start)
+        return n
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        items = sum(executor.map(_timed, range(iterations)))
+    return latencies, time.perf_counter() - start, items
+
+
+def bench_crawler(args) -> List[Dict]:
+    """测试从首页、栏目页和RSS抓取新闻列表。"""
+    from src.crawler import BBCCrawler
+
+    server = fake_bbc.start_server(latency_ms=args.latency_ms)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    crawler = BBCCrawler(sources=[
+        {"type": "most_read", "url": f"{base}/news"},
+        {"type": "section", "url": f"{base}/news/world"},
+        {"type": "rss", "url": f"{base}/news/rss.xml"},
+    ])
+
+    latencies, items = [], 0
+    start = time.perf_counter()
+    try:
+        for _ in range(args.iterations):
+            t = time.perf_counter()
+            items += len(asyncio.run(crawler.fetch_all()))
+            latencies.append(time.perf_counter() - t)
+        wall = time.perf_counter() - start
+    finally:
+        server.shutdown()
+    return [summarize("crawler.fetch_all", latencies, wall, items)]
+
+
+def bench_fetcher(args) -> List[Dict]:
+    """测试并发获取文章正文（含HTML归档）。"""
+    from src.article_fetcher import ArticleFetcher
+    from src.html_archive import HtmlArchive
+
+    server = fake_bbc.start_server(latency_ms=args.latency_ms)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    with tempfile.TemporaryDirectory(prefix="bench-archive-") as archive_dir:
+        fetcher = ArticleFetcher(archive=HtmlArchive(archive_dir))
+
+        def _fetch(i: int) -> int:
+            result = asyncio.run(fetcher.fetch_content(f"{base}/news/articles/bench{i:04d}"))
+            return 1 if result else 0
+
+        try:
+            latencies, wall, items = run_concurrent(_fetch, args.iterations, args.concurrency)
+        finally:
+            server.shutdown()
+    return [summarize("fetcher.fetch_content", latencies, wall, items)]
+
+
+def _start_llm(args) -> None:
+    """启动LLM替身服务器并将配置指向它。"""
+    from config.config import LLM_CONFIG
+
+    server = fake_llm.start_server(
+        ttft_ms=args.ttft_ms, tokens_per_sec=args.tokens_per_sec
+    )
+    LLM_CONFIG["base_url"] = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    os.environ.setdefault("DASHSCOPE_API_KEY", "bench")
+
+
+def _fixture_body() -> str:
+    """从文章页面fixture中解析出英文正文。"""
+    from src.article_fetcher import extract_article
+
+    html = (fake_bbc.FIXTURES_DIR / "article.html").read_text(encoding="utf-8")
+    return extract_article(html)["content_en"]
+
+
+def bench_translator(args) -> List[Dict]:
+    """测试标题和正文翻译。"""
+    _start_llm(args)
+    from src.ai.translator import Translator
+
+    translator = Translator()
+    body = _fixture_body()
+    title = "Benchmark headline about world events"
+
+    results = []
+    for name, text, task in (("translator.title", title, "title"), ("translator.body", body, "body")):
+        latencies, wall, items = run_concurrent(
+            lambda i: 1 if translator.translate(text, task=task) else 0, args.iterations, args.concurrency
+        )
+        results.append(summarize(name, latencies, wall, items))
+    return results
+
+
+def bench_polisher(args) -> List[Dict]:
+    """测试中文正文润色。"""
+    _start_llm(args)
+    from src.ai.polisher import Polisher
+
+    polisher = Polisher()
+    text = "\n\n".join(["官员周二证实，新政策将于下月初生效。此前双方进行了数周的谈判。"] * 24)
+    # 每次输入不同，避免命中polish_outputs中保存的润色结果，测到的是实际的模型调用
+    latencies, wall, items = run_concurrent(
+        lambda i: 1 if polisher.polish(f"{text}\n\n样本编号{i}。") else 0, args.iterations, args.concurrency
+    )
+    return [summarize("polisher.polish", latencies, wall, items)]
+
+
+def bench_database(args) -> List[Dict]:
+    """用合成数据测试Database各方法，数据量由--size指定。"""
+    from models.database import Database
+
+    with tempfile.TemporaryDirectory(prefix="bench-db-") as db_dir:
+        return _bench_database(args, Database(str(Path(db_dir) / "bench.db")))
+
+
+def _bench_database(args, db) -> List[Dict]:
+    """在临时数据库上写入合成数据并测量各查询。"""
+    size = args.size
+    statuses = ["crawled"] * 70 + ["translated"] * 25 + ["polished"] * 5
+    body = " ".join(["lorem ipsum dolor sit amet"] * (args.content_chars // 27 + 1))[:args.content_chars]
+    rng = random.Random(42)
+
+    results = []
+    chunk = 10000
+    latencies = []
+    start = time.perf_counter()
+    for offset in range(0, size, chunk):
+        batch = [{
+            "title_en": f"Synthetic headline {i} about topic {i % 997}",
+            "url": f"https://www.bbc.com/news/articles/synthetic{i:08d}",
+            "published_at": f"2026-02-{i % 28 + 1:02d}T08:00:00",
+        } for i in range(offset, min(offset + chunk, size))]
+        t = time.perf_counter()
+        db.add_articles_batch(batch)
+        latencies.append(time.perf_counter() - t)
+    results.append(summarize(f"db[{size}].add_articles_batch/{chunk}", latencies, time.perf_counter() - start, size))
+
+    # 填充正文和状态，使查询的数据量接近真实情况
+    with db._cursor() as cursor:
+        cursor.executemany(
+            "UPDATE articles SET content_en = ?, status = ? WHERE id = ?",
+            ((body, statuses[i % len(statuses)], i + 1) for i in range(size))
+        )
+
+    def _measure(name: str, fn: Callable[[], object], iterations: int) -> None:
+        samples = []
+        begin = time.perf_counter()
+        for _ in range(iterations):
+            t = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - t)
+        results.append(summarize(f"db[{size}].{name}", samples, time.perf_counter() - begin, iterations))
+
+    n = args.iterations
+    _measure("get_article_by_id", lambda: db.get_article_by_id(rng.randint(1, size)), n * 10)
+    _measure("article_exists", lambda: db.article_exists(
+        f"https://www.bbc.com/news/articles/synthetic{rng.randrange(size):08d}"), n * 10)
+    _measure("update_article", lambda: db.update_article(rng.randint(1, size), {"title_zh": "合成标题"}), n * 10)
+    _measure("get_articles_count", lambda: db.get_articles_count(), n)
+    _measure("get_articles_count(status)", lambda: db.get_articles_count("translated"), n)
+    _measure("get_stats", lambda: db.get_stats("2000-01-01"), n)
+    _measure("get_article_ids(status)", lambda: db.get_article_ids("crawled", 100), n)
+    _measure("search_articles", lambda: db.search_articles("topic 42"), max(1, n // 4))
+    _measure("get_all_articles(polished)", lambda: db.get_all_articles("polished"), max(1, n // 4))
+    return results
+
+
+BENCHES = {
+    "crawler": bench_crawler,
+    "fetcher": bench_fetcher,
+    "translator": bench_translator,
+    "polisher": bench_polisher,
+    "database": bench_database,
+}
+
+
+def print_table(results: List[Dict]) -> None:
+    """打印结果表格。"""
+    header = f"{'name':<44} {'count':>7} {'p50(ms)':>10} {'p95(ms)':>10} {'ops/s':>10} {'peakRSS(MB)':>12}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['name']:<44} {r['count']:>7} {r['p50_ms']:>10.2f} {r['p95_ms']:>10.2f} "
+              f"{r['throughput']:>10.2f} {r['peak_rss_mb']:>12.1f}")
+
+
+def main():
+    """命令行入口。"""
+    parser = argparse.ArgumentParser(description="离线端到端基准测试")
+    parser.add_argument("targets", nargs="+", choices=TARGETS + ["all"])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=100, help="BBC替身服务器的响应延迟")
+    parser.add_argument("--ttft-ms", type=float, default=200, help="LLM替身服务器的首字延迟")
+    parser.add_argument("--tokens-per-sec", type=float, default=200, help="LLM替身服务器的生成速度")
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="数据库测试的文章数量，逗号分隔")
+    parser.add_argument("--content-chars", type=int, default=2000, help="合成文章的正文长度")
+    parser.add_argument("--size", type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--json", action="store_true", help="以JSON格式输出结果")
+    args = parser.parse_args()
+
+    if args.child:
+        # 全局db指向临时数据库，大模型调用记录、润色结果等不会写入正式的db/news.db
+        from models.database import db
+
+        with tempfile.TemporaryDirectory(prefix="bench-db-") as db_dir:
+            db.db_path = str(Path(db_dir) / "news.db")
+            print(json.dumps(BENCHES[args.targets[0]](args)))
+        return
+
+    targets = TARGETS if "all" in args.targets else args.targets
+    passthrough = [arg for arg in sys.argv[1:] if arg not in TARGETS + ["all", "--json"]]
+    results: List[Dict] = []
+    for target in targets:
+        sizes = [int(s) for s in args.sizes.split(",")] if target == "database" else [0]
+        for size in sizes:
+            print(f"运行 {target}{f' ({size})' if size else ''} ...", file=sys.stderr)
+            proc = subprocess.run(
+                [sys.executable, "-m", "bench.run_bench", target, "--child", "--size", str(size)] + passthrough,
+                cwd=BACKEND_DIR, capture_output=True, text=True
+            )
+            if proc.returncode != 0:
+                print(f"{target} 运行失败:\n{proc.stderr}", file=sys.stderr)
+                continue
+            results.extend(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+
+
+if __name__ == "__main__":
+    main()
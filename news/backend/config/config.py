@@ -5,6 +5,11 @@
 import os
 from pathlib import Path
 
+from dotenv import load_dotenv
+
+# 在读取环境变量之前加载.env，整个进程只加载一次
+load_dotenv()
+
 # 项目根目录
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -24,6 +29,168 @@ CRAWLER_CONFIG = {
     "timeout": 30,
     "retry_times": 3,
     "retry_delay": 2,
+    # 爬取来源：most_read为首页Most Read区域，section为BBC栏目页，rss为RSS/Atom订阅源
+    "sources": [
+        {"type": "most_read", "url": "https://www.bbc.com/news"},
+        {"type": "section", "url": "https://www.bbc.com/news/world"},
+        {"type": "section", "url": "https://www.bbc.com/news/business"},
+        {"type": "section", "url": "https://www.bbc.com/news/technology"},
+        {"type": "rss", "url": "https://feeds.bbci.co.uk/news/rss.xml"},
+        {"type": "rss", "url": "https://feeds.bbci.co.uk/news/world/rss.xml"},
+    ],
+    # 同时抓取的来源数量上限（栏目页共用一个浏览器，每个来源一个页面）
+    "concurrency": 4,
+    # URL规范化：统一主机名，去除跟踪参数
+    "canonical_host": "www.bbc.com",
+    "host_aliases": ["bbc.com", "bbc.co.uk", "www.bbc.co.uk", "m.bbc.com", "m.bbc.co.uk"],
+    "tracking_params": ["at_medium", "at_campaign", "at_link_id", "at_link_type", "at_format",
+                        "at_ptr_name", "at_bbc_team", "at_link_origin", "at_custom1", "at_custom2",
+                        "at_custom3", "at_custom4", "xtor", "ocid", "fbclid", "gclid", "ns_mchannel",
+                        "ns_source", "ns_campaign", "ns_linkname", "ns_fee"],
+}
+
+# 大模型API配置（基准测试时可通过环境变量指向本地替身服务器）
+LLM_CONFIG = {
+    "base_url": os.getenv("DASHSCOPE_BASE_URL", "https://dashscope.aliyuncs.com/compatible-mode/v1"),
+    # 流式输出为非增量式（每个分片都是完整结果）的模型
+    "non_incremental_stream_models": ["qwen-mt-plus", "qwen-mt-turbo"],
+}
+
+# 模型路由配置：按任务和输入长度（字符数）选择模型、max_tokens上限和超时（秒）
+# 每个任务按顺序匹配第一条 max_chars 不小于输入长度的规则，max_chars为None表示不限
+LLM_ROUTING = {
+    "title": [
+        {"max_chars": None, "model": "qwen-mt-turbo", "max_tokens": 256, "timeout": 20},
+    ],
+    "body": [
+        {"max_chars": 1500, "model": "qwen-mt-turbo", "max_tokens": 2048, "timeout": 60},
+        {"max_chars": None, "model": "qwen-mt-plus", "max_tokens": 8192, "timeout": 180},
+    ],
+    "polish": [
+        {"max_chars": 1500, "model": "qwen-plus", "max_tokens": 2048, "timeout": 90},
+        {"max_chars": None, "model": "qwen3-max", "max_tokens": 4096, "timeout": 180},
+    ],
+}
+
+# 翻译任务的输出token估算：每个输入字符约对应的输出token数，再加固定余量
+LLM_OUTPUT_ESTIMATE = {"tokens_per_char": 0.6, "margin": 128}
+
+# 正文超过该长度（字符）时按段落切块并发翻译
+TRANSLATE_CHUNK_CONFIG = {"max_chars": 6000, "concurrency": 3}
+
+# 爬取后并发翻译新标题的线程数，实际并发还受SCHEDULER_CONFIG中该模型的名额限制
+TRANSLATE_TITLE_CONFIG = {"concurrency": 8}
+
+# 模型价格（元/百万token），用于记录每次调用的成本，请以阿里云官网最新价格为准
+# cached_input为命中服务端前缀缓存的输入token价格，未配置时按input计算
+LLM_PRICING = {
+    "qwen-mt-turbo": {"input": 0.7, "output": 1.95},
+    "qwen-mt-plus": {"input": 1.8, "output": 5.4},
+    "qwen-plus": {"input": 0.8, "output": 2.0, "cached_input": 0.32},
+    "qwen3-max": {"input": 6.0, "output": 24.0, "cached_input": 2.4},
+}
+
+# 近似重复检测配置
+DEDUP_CONFIG = {
+    # SimHash特征为连续单词组成的shingle
+    "shingle_size": 3,
+    # 汉明距离不超过该值视为近似重复；指纹按16位分4段建索引，保证距离<=3时必定命中
+    "max_distance": 3,
+    # 为已翻译的旧文章补算指纹时每批处理的文章数
+    "backfill_chunk_size": 500,
+}
+
+# 内容刷新配置
+REFRESH_CONFIG = {
+    # 重新获取最近多少天内爬取的文章
+    "days": 2,
+    # 同时重新获取的文章数量
+    "concurrency": 3,
+}
+
+# 原始HTML归档配置
+ARCHIVE_CONFIG = {
+    "path": BASE_DIR / "archive",
+    # zstd需要安装zstandard，未安装时自动使用zlib
+    "compression": "zstd",
+    "level": 10,
+    # 离线重新解析的进程数，None表示使用CPU核数
+    "workers": None,
+}
+
+# 图片缓存配置
+IMAGE_CONFIG = {
+    "path": BASE_DIR / "image_cache",
+    # 缓存目录总大小上限（字节），超过后按最近访问时间淘汰
+    "max_bytes": 512 * 1024 * 1024,
+    # 预生成的尺寸：最大宽度（像素），未安装Pillow时返回原图
+    "variants": {"thumb": 320, "detail": 1024},
+    # 输出格式：webp，Pillow不支持webp时使用jpeg
+    "format": "webp",
+    "quality": 80,
+    # 浏览器缓存时间（秒），过期后凭ETag重新验证
+    "max_age": 30 * 24 * 3600,
+    # 下载原图的超时和大小上限
+    "timeout": 15,
+    "max_download_bytes": 10 * 1024 * 1024,
+    # 下载或处理失败的图片在该时间（秒）内直接返回失败，不再请求上游
+    "failure_ttl": 300,
+    # 获取文章内容后预先下载图片并生成各尺寸
+    "prewarm": True,
+    # API请求中在后台线程预热，不占用请求时间；该值为后台线程数
+    "prewarm_workers": 2,
+}
+
+# 批量任务配置
+BATCH_CONFIG = {
+    # 同时处理的文章数量上限
+    "concurrency": 4,
+    # 单次批量任务最多处理的文章数量
+    "max_items": 100,
+    # 内存中保留的已完成任务数量
+    "keep_jobs": 50,
+}
+
+# 导出导入配置
+EXPORT_CONFIG = {
+    # 导出时每次从数据库读取的行数（cursor.fetchmany）
+    "fetch_size": 500,
+    # 导入时每个事务写入的文章数量
+    "import_chunk_size": 1000,
+    # gzip导出的压缩级别
+    "gzip_level": 6,
+}
+
+# 优先级调度配置：共享资源的总名额和为interactive通道（API手动操作）保留的名额
+SCHEDULER_CONFIG = {
+    # 同时打开的Playwright浏览器会话/页面
+    "browser": {"capacity": 4, "reserved_interactive": 1},
+    # 每个模型同时进行的大模型调用，未单独配置的模型使用default
+    "llm": {
+        "default": {"capacity": 4, "reserved_interactive": 1},
+        "qwen3-max": {"capacity": 2, "reserved_interactive": 1},
+    },
+}
+
+# 变更订阅配置
+CHANGES_CONFIG = {
+    # 单次最多返回的变更数量
+    "page_size": 200,
+    # 长轮询最长等待秒数
+    "max_wait": 30,
+    # 长轮询期间重新查询数据库的间隔（秒），用于发现其他进程的写入
+    "poll_interval": 2,
+}
+
+# 请求追踪配置
+TRACING_CONFIG = {
+    "enabled": True,
+    # 总耗时超过该值（毫秒）的请求，将完整span树以JSON写入日志
+    "slow_request_ms": 10000,
+    # 单个trace最多记录的span数量
+    "max_spans": 500,
+    # 可选：慢请求trace以JSON POST到本地采集器
+    "export_url": os.getenv("TRACE_EXPORT_URL"),
 }
 
 # 日志配置
@@ -2,12 +2,160 @@
 
 负责SQLite数据库的初始化和CRUD操作，支持文章的增删改查。
 """
+import functools
 import sqlite3
+import threading
+import time
 from datetime import datetime
-from typing import List, Optional
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
 from contextlib import contextmanager
 
-from config.config import DATABASE_CONFIG
+from config.config import DATABASE_CONFIG, EXPORT_CONFIG
+from src.dedup import hamming_distance
+from src.metrics import DB_QUERY_SECONDS
+from src.tracing import span
+
+FINGERPRINT_BANDS = 4
+
+# 后续版本新增的字段，旧数据库初始化时补齐
+ARTICLE_MIGRATIONS = (
+    ("content_polished", "TEXT"),
+    ("translated_at", "TEXT"),
+    ("polished_at", "TEXT"),
+    ("simhash", "INTEGER"),
+    ("content_hash", "TEXT"),
+    ("html_sha", "TEXT"),
+    ("change_seq", "INTEGER"),
+)
+LLM_CALL_MIGRATIONS = (
+    ("cached_tokens", "INTEGER"),
+)
+
+# 统计表：由触发器在写入时维护，查询数量时无需扫描文章表
+COUNTER_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS article_status_counts (
+        status TEXT PRIMARY KEY,        -- 状态
+        count INTEGER NOT NULL          -- 文章数
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS article_daily_counts (
+        day TEXT NOT NULL,              -- 爬取日期 YYYY-MM-DD
+        status TEXT NOT NULL,           -- 状态
+        count INTEGER NOT NULL,         -- 文章数
+        PRIMARY KEY (day, status)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS article_stage_counts (
+        stage TEXT PRIMARY KEY,         -- 待处理阶段：fetch/translate/polish，已完成为done
+        count INTEGER NOT NULL          -- 文章数
+    ) WITHOUT ROWID
+    """,
+)
+
+
+def _counter_keys(row: str) -> dict:
+    """返回统计表中某一行（NEW或OLD）对应的键表达式。"""
+    return {
+        "status": f"COALESCE({row}.status, 'unknown')",
+        "day": f"substr({row}.crawled_at, 1, 10)",
+        "stage": f"""CASE
+            WHEN COALESCE({row}.content_en, '') = '' THEN 'fetch'
+            WHEN COALESCE({row}.content_zh, '') = '' THEN 'translate'
+            WHEN COALESCE({row}.content_polished, '') = '' THEN 'polish'
+            ELSE 'done' END""",
+    }
+
+
+def _counter_updates(row: str, delta: str) -> str:
+    """生成将某一行计入（+1）或移出（-1）各统计表的SQL语句。"""
+    keys = _counter_keys(row)
+    return f"""
+        INSERT INTO article_status_counts (status, count) VALUES ({keys["status"]}, {delta})
+            ON CONFLICT (status) DO UPDATE SET count = count + ({delta});
+        INSERT INTO article_daily_counts (day, status, count)
+            VALUES ({keys["day"]}, {keys["status"]}, {delta})
+            ON CONFLICT (day, status) DO UPDATE SET count = count + ({delta});
+        INSERT INTO article_stage_counts (stage, count) VALUES ({keys["stage"]}, {delta})
+            ON CONFLICT (stage) DO UPDATE SET count = count + ({delta});
+    """
+
+
+COUNTER_TRIGGERS = {
+    "trg_articles_count_insert": f"""
+        CREATE TRIGGER trg_articles_count_insert AFTER INSERT ON articles
+        BEGIN {_counter_updates("NEW", "1")} END
+    """,
+    "trg_articles_count_delete": f"""
+        CREATE TRIGGER trg_articles_count_delete AFTER DELETE ON articles
+        BEGIN {_counter_updates("OLD", "-1")} END
+    """,
+    # 只有影响统计键的字段变化时才更新
+    "trg_articles_count_update": f"""
+        CREATE TRIGGER trg_articles_count_update
+        AFTER UPDATE OF status, crawled_at, content_en, content_zh, content_polished ON articles
+        WHEN {_counter_keys("OLD")["status"]} IS NOT {_counter_keys("NEW")["status"]}
+          OR {_counter_keys("OLD")["day"]} IS NOT {_counter_keys("NEW")["day"]}
+          OR ({_counter_keys("OLD")["stage"]}) IS NOT ({_counter_keys("NEW")["stage"]})
+        BEGIN {_counter_updates("OLD", "-1")} {_counter_updates("NEW", "1")} END
+    """,
+}
+
+# 变更序号：文章每次插入或更新时由触发器在同一写事务内分配递增序号。
+# SQLite同一时间只有一个写事务，序号的提交顺序与分配顺序一致，
+# 读到序号N时不会再有更小序号的写入提交，可作为变更订阅的游标
+CHANGE_SEQ_TABLE = """
+    CREATE TABLE IF NOT EXISTS article_change_seq (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        value INTEGER NOT NULL          -- 最近分配的变更序号
+    )
+"""
+_ASSIGN_CHANGE_SEQ = """
+    UPDATE article_change_seq SET value = value + 1 WHERE id = 1;
+    UPDATE articles SET change_seq = (SELECT value FROM article_change_seq WHERE id = 1)
+    WHERE id = NEW.id;
+"""
+CHANGE_SEQ_TRIGGERS = {
+    "trg_articles_change_insert": f"""
+        CREATE TRIGGER trg_articles_change_insert AFTER INSERT ON articles
+        BEGIN {_ASSIGN_CHANGE_SEQ} END
+    """,
+    # 触发器内对change_seq本身的更新不再重复分配
+    "trg_articles_change_update": f"""
+        CREATE TRIGGER trg_articles_change_update AFTER UPDATE ON articles
+        WHEN NEW.change_seq IS OLD.change_seq
+        BEGIN {_ASSIGN_CHANGE_SEQ} END
+    """,
+}
+
+# 导入时写入的文章字段（id由目标库重新分配）
+IMPORT_COLUMNS = (
+    "title_en", "title_zh", "summary_en", "summary_zh", "content_en", "content_zh",
+    "content_polished", "url", "image_url", "published_at", "crawled_at", "translated_at",
+    "polished_at", "status", "created_at", "updated_at", "simhash", "content_hash", "html_sha",
+)
+
+# 变更订阅返回的列表字段，不包含正文
+CHANGE_COLUMNS = (
+    "id", "title_en", "title_zh", "url", "image_url", "published_at", "crawled_at",
+    "translated_at", "polished_at", "status", "updated_at", "change_seq",
+)
+
+
+def _timed(method):
+    """记录Database方法耗时的装饰器，在请求追踪中记为子span。"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            with span(f"db.{method.__name__}", child_only=True):
+                return method(self, *args, **kwargs)
+        finally:
+            DB_QUERY_SECONDS.observe(time.perf_counter() - start, method=method.__name__)
+    return wrapper
 
 
 class Database:
@@ -20,23 +168,41 @@ class Database:
             db_path: 数据库文件路径，默认为config中配置的路径。
         """
         self.db_path = db_path or DATABASE_CONFIG["path"]
-        self._init_db()
+        # 本进程内的写入计数，用于唤醒等待变更的长轮询请求
+        self._change_version = 0
+        self._change_cond = threading.Condition()
+        # 表结构在首次获取连接时初始化，导入模块本身不访问数据库
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """打开数据库连接，数据库目录不存在时自动创建。"""
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        return sqlite3.connect(self.db_path)
 
     def _get_connection(self) -> sqlite3.Connection:
-        """获取数据库连接。
+        """获取数据库连接，首次调用时初始化表结构。
 
         Returns:
             sqlite3.Connection: 数据库连接对象。
         """
-        return sqlite3.connect(self.db_path)
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    self._init_db()
+                    self._initialized = True
+        return self._connect()
 
     @contextmanager
-    def _cursor(self):
+    def _cursor(self, conn: Optional[sqlite3.Connection] = None):
         """获取数据库游标的上下文管理器。
 
         自动处理事务提交和异常回滚，确保数据一致性。
+
+        Args:
+            conn: 可选，使用指定的连接（初始化表结构时使用）。
         """
-        conn = self._get_connection()
+        conn = conn or self._get_connection()
         try:
             cursor = conn.cursor()
             yield cursor
@@ -49,7 +215,7 @@ class Database:
 
     def _init_db(self) -> None:
         """初始化数据库，创建文章表和索引。"""
-        with self._cursor() as cursor:
+        with self._cursor(self._connect()) as cursor:
             # 创建文章表
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS articles (
@@ -74,20 +240,53 @@ class Database:
             """)
             
             # 为已存在的数据库添加新字段（迁移）
-            try:
-                cursor.execute("ALTER TABLE articles ADD COLUMN content_polished TEXT")
-            except sqlite3.OperationalError:
-                pass  # 字段已存在
-                
-            try:
-                cursor.execute("ALTER TABLE articles ADD COLUMN translated_at TEXT")
-            except sqlite3.OperationalError:
-                pass  # 字段已存在
-                
-            try:
-                cursor.execute("ALTER TABLE articles ADD COLUMN polished_at TEXT")
-            except sqlite3.OperationalError:
-                pass  # 字段已存在
+            _add_missing_columns(cursor, "articles", ARTICLE_MIGRATIONS)
+
+            # 大模型调用记录表，用于分析路由规则的延迟和成本
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS llm_calls (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    task TEXT NOT NULL,             -- 任务：title/body/polish
+                    model TEXT NOT NULL,            -- 路由选择的模型
+                    input_chars INTEGER,            -- 输入字符数
+                    max_tokens INTEGER,             -- 路由设置的max_tokens
+                    prompt_tokens INTEGER,          -- 输入token数（usage）
+                    completion_tokens INTEGER,      -- 输出token数（usage）
+                    cached_tokens INTEGER,          -- 命中服务端前缀缓存的输入token数
+                    ttft_ms REAL,                   -- 首个token延迟
+                    latency_ms REAL,                -- 总耗时
+                    cost REAL,                      -- 估算费用（元）
+                    ok INTEGER NOT NULL,            -- 是否成功
+                    created_at TEXT NOT NULL        -- 调用时间
+                )
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_llm_calls_created_at ON llm_calls(created_at)
+            """)
+
+            _add_missing_columns(cursor, "llm_calls", LLM_CALL_MIGRATIONS)
+
+            # 润色结果存储：相同提示词版本、模型和中文原文的润色结果直接复用
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS polish_outputs (
+                    prompt_version TEXT NOT NULL,   -- 润色提示词版本
+                    model TEXT NOT NULL,            -- 润色模型
+                    content_sha TEXT NOT NULL,      -- 中文原文的SHA-256
+                    content_polished TEXT NOT NULL, -- 润色结果
+                    created_at TEXT NOT NULL,       -- 生成时间
+                    PRIMARY KEY (prompt_version, model, content_sha)
+                ) WITHOUT ROWID
+            """)
+
+            # 指纹分段索引表：64位SimHash按16位拆成4段，任一段相同即为候选
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS article_fingerprints (
+                    band INTEGER NOT NULL,          -- 段序号 0-3
+                    value INTEGER NOT NULL,         -- 该段的16位取值
+                    article_id INTEGER NOT NULL,    -- 文章ID
+                    PRIMARY KEY (band, value, article_id)
+                ) WITHOUT ROWID
+            """)
                 
             # URL索引，加速去重查询
             cursor.execute("""
@@ -97,7 +296,24 @@ class Database:
             cursor.execute("""
                 CREATE INDEX IF NOT EXISTS idx_articles_status ON articles(status)
             """)
+            # 状态+爬取时间索引，按状态筛选的分页列表无需排序
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_articles_status_crawled_at ON articles(status, crawled_at)
+            """)
+            # 爬取时间索引，加速排序和按时间范围查询
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_articles_crawled_at ON articles(crawled_at)
+            """)
+            # 变更序号索引，用于按游标增量读取变更
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_articles_change_seq ON articles(change_seq)
+            """)
+            cursor.execute("DROP INDEX IF EXISTS idx_articles_updated_at")
 
+            _init_counters(cursor)
+            _init_change_seq(cursor)
+
+    @_timed
     def article_exists(self, url: str) -> bool:
         """检查文章是否已存在（根据URL去重）。
 
@@ -111,6 +327,7 @@ class Database:
             cursor.execute("SELECT 1 FROM articles WHERE url = ?", (url,))
             return cursor.fetchone() is not None
 
+    @_timed
     def add_article(self, article: dict) -> int:
         """添加单篇文章到数据库。
 
@@ -137,8 +354,11 @@ class Database:
                 now,
                 now
             ))
-            return cursor.lastrowid
+            article_id = cursor.lastrowid
+        self._notify_change()
+        return article_id
 
+    @_timed
     def add_articles_batch(self, articles: List[dict]) -> int:
         """批量添加文章（自动去重）。
 
@@ -147,56 +367,211 @@ class Database:
 
         Returns:
             int: 实际新增的文章数量（去重后）。
+
+        Raises:
+            sqlite3.IntegrityError: 文章缺少必填字段，整批回滚。
         """
         count = 0
         now = datetime.now().isoformat()
         with self._cursor() as cursor:
             for article in articles:
-                if not self.article_exists(article["url"]):
-                    cursor.execute("""
-                        INSERT INTO articles (
-                            title_en, title_zh, url, image_url, published_at, crawled_at,
-                            status, created_at, updated_at
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        article["title_en"],
-                        article.get("title_zh", ""),
-                        article["url"],
-                        article.get("image_url"),
-                        article.get("published_at"),
-                        article.get("crawled_at", now),
-                        "crawled",
-                        now,
-                        now
-                    ))
-                    count += 1
+                # 依赖url的UNIQUE约束去重，同一事务内完成，无需逐条查询；
+                # 只忽略url冲突，缺少必填字段时照常报错
+                cursor.execute("""
+                    INSERT INTO articles (
+                        title_en, title_zh, url, image_url, published_at, crawled_at,
+                        status, created_at, updated_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (url) DO NOTHING
+                """, (
+                    article["title_en"],
+                    article.get("title_zh", ""),
+                    article["url"],
+                    article.get("image_url"),
+                    article.get("published_at"),
+                    article.get("crawled_at") or now,
+                    "crawled",
+                    now,
+                    now
+                ))
+                count += cursor.rowcount
+        if count:
+            self._notify_change()
         return count
 
+    @_timed
     def get_all_articles(
         self,
-        status: Optional[str] = None
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
     ) -> List[dict]:
-        """获取所有文章。
+        """获取所有文章，可分页。
 
         Args:
             status: 可选，按状态筛选（如'crawled'、'translated'）。
+            limit: 可选，最多返回的数量，不指定时返回全部。
+            offset: 跳过的数量，与limit一起用于分页。
 
         Returns:
             List[dict]: 文章列表，按爬取时间倒序排列。
         """
+        where, params = ("WHERE status = ?", [status]) if status else ("", [])
+        page = ""
+        if limit is not None:
+            page = "LIMIT ? OFFSET ?"
+            params += [limit, offset]
+        with self._cursor() as cursor:
+            cursor.execute(
+                f"SELECT * FROM articles {where} ORDER BY crawled_at DESC {page}", params
+            )
+            columns = [desc[0] for desc in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    @_timed
+    def import_articles_batch(self, articles: List[dict]) -> int:
+        """批量导入完整的文章记录（按url去重），并写入SimHash分段索引。
+
+        与add_articles_batch不同，会保留正文、译文、状态和时间等全部字段。
+
+        Args:
+            articles: 文章列表，字段同导出的NDJSON，必须包含title_en和url。
+
+        Returns:
+            int: 实际新增的文章数量（已存在的url会被跳过）。
+
+        Raises:
+            sqlite3.IntegrityError: 记录缺少title_en或url等必填字段，整批回滚。
+        """
+        count = 0
+        now = datetime.now().isoformat()
+        placeholders = ", ".join("?" for _ in IMPORT_COLUMNS)
+        # 只忽略url重复；OR IGNORE会把缺少必填字段的记录也静默丢弃
+        sql = (
+            f"INSERT INTO articles ({', '.join(IMPORT_COLUMNS)}) VALUES ({placeholders}) "
+            "ON CONFLICT (url) DO NOTHING"
+        )
+        defaults = {"crawled_at": now, "status": "crawled", "created_at": now, "updated_at": now}
+        with self._cursor() as cursor:
+            for article in articles:
+                row = dict(article)
+                for column, value in defaults.items():
+                    if row.get(column) is None:
+                        row[column] = value
+                cursor.execute(sql, tuple(row.get(column) for column in IMPORT_COLUMNS))
+                if cursor.rowcount == 0:
+                    continue
+                count += 1
+                if row.get("simhash") is not None:
+                    cursor.executemany(
+                        "INSERT INTO article_fingerprints (band, value, article_id) VALUES (?, ?, ?)",
+                        [(band, value, cursor.lastrowid) for band, value in _fingerprint_bands(row["simhash"])]
+                    )
+        if count:
+            self._notify_change()
+        return count
+
+    def iter_articles(
+        self,
+        status: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        fetch_size: Optional[int] = None
+    ) -> Iterator[dict]:
+        """按ID顺序逐批读取文章，内存占用与表大小无关，用于导出。
+
+        生成器在迭代期间保持连接打开，因此不使用_timed（只能记录到创建耗时）。
+
+        Args:
+            status: 可选，按状态筛选。
+            since: 可选，ISO格式时间，只导出该时间及之后爬取的文章。
+            until: 可选，ISO格式时间，只导出该时间之前爬取的文章。
+            fetch_size: 每次fetchmany读取的行数，默认EXPORT_CONFIG["fetch_size"]。
+
+        Yields:
+            dict: 文章记录。
+        """
+        conditions, params = [], []
+        if status:
+            conditions.append("status = ?")
+            params.append(status)
+        if since:
+            conditions.append("crawled_at >= ?")
+            params.append(since)
+        if until:
+            conditions.append("crawled_at < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with self._cursor() as cursor:
+            cursor.execute(f"SELECT * FROM articles {where} ORDER BY id", params)
+            columns = [desc[0] for desc in cursor.description]
+            while True:
+                rows = cursor.fetchmany(fetch_size or EXPORT_CONFIG["fetch_size"])
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(zip(columns, row))
+
+    @_timed
+    def get_article_ids(self, status: Optional[str] = None, limit: int = 100) -> List[int]:
+        """获取文章ID列表（不读取正文）。
+
+        Args:
+            status: 可选，按状态筛选。
+            limit: 最多返回的数量。
+
+        Returns:
+            List[int]: 文章ID列表，按爬取时间倒序排列。
+        """
         with self._cursor() as cursor:
             if status:
                 cursor.execute(
-                    "SELECT * FROM articles WHERE status = ? ORDER BY crawled_at DESC",
-                    (status,)
+                    "SELECT id FROM articles WHERE status = ? ORDER BY crawled_at DESC LIMIT ?",
+                    (status, limit)
                 )
             else:
                 cursor.execute(
-                    "SELECT * FROM articles ORDER BY crawled_at DESC"
+                    "SELECT id FROM articles ORDER BY crawled_at DESC LIMIT ?",
+                    (limit,)
                 )
+            return [row[0] for row in cursor.fetchall()]
+
+    @_timed
+    def get_recent_articles(self, since: str) -> List[dict]:
+        """获取指定时间之后爬取且已有正文的文章。
+
+        Args:
+            since: ISO格式时间，只返回crawled_at不早于该时间的文章。
+
+        Returns:
+            List[dict]: 文章列表，按爬取时间倒序排列。
+        """
+        with self._cursor() as cursor:
+            cursor.execute(
+                "SELECT * FROM articles WHERE crawled_at >= ? AND content_en IS NOT NULL AND content_en != '' "
+                "ORDER BY crawled_at DESC",
+                (since,)
+            )
+            columns = [desc[0] for desc in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    @_timed
+    def get_archived_articles(self) -> List[dict]:
+        """获取所有有HTML归档的文章（仅包含重新解析所需字段）。
+
+        Returns:
+            List[dict]: 包含id、html_sha、content_hash、image_url、published_at的文章列表。
+        """
+        with self._cursor() as cursor:
+            cursor.execute(
+                "SELECT id, html_sha, content_hash, image_url, published_at "
+                "FROM articles WHERE html_sha IS NOT NULL"
+            )
             columns = [desc[0] for desc in cursor.description]
             return [dict(zip(columns, row)) for row in cursor.fetchall()]
 
+    @_timed
     def search_articles(self, keyword: str) -> List[dict]:
         """搜索文章（按标题）。
 
@@ -214,6 +589,7 @@ class Database:
             columns = [desc[0] for desc in cursor.description]
             return [dict(zip(columns, row)) for row in cursor.fetchall()]
 
+    @_timed
     def get_article_by_id(self, article_id: int) -> Optional[dict]:
         """根据ID获取单篇文章。
 
@@ -234,12 +610,15 @@ class Database:
                 return dict(zip(columns, row))
             return None
 
-    def update_article(self, article_id: int, data: dict) -> bool:
+    @_timed
+    def update_article(self, article_id: int, data: dict, expected: Optional[dict] = None) -> bool:
         """更新文章内容。
 
         Args:
             article_id: 文章ID。
             data: 要更新的字段和值。
+            expected: 可选，条件更新：只有这些字段仍等于给定值时才写入，
+                用于避免基于旧输入的结果覆盖新数据。
 
         Returns:
             bool: 更新成功返回True，否则返回False。
@@ -247,13 +626,300 @@ class Database:
         data["updated_at"] = datetime.now().isoformat()
         set_clause = ", ".join([f"{k} = ?" for k in data.keys()])
         values = list(data.values()) + [article_id]
+        where = "id = ?"
+        for k, v in (expected or {}).items():
+            where += f" AND {k} IS ?"
+            values.append(v)
         with self._cursor() as cursor:
             cursor.execute(
-                f"UPDATE articles SET {set_clause} WHERE id = ?",
+                f"UPDATE articles SET {set_clause} WHERE {where}",
                 values
             )
-            return cursor.rowcount > 0
+            updated = cursor.rowcount > 0
+        if updated:
+            self._notify_change()
+        return updated
+
+    @_timed
+    def get_change_cursor(self) -> str:
+        """返回当前最新变更的游标，客户端加载列表后从该位置开始订阅变更。
+
+        Returns:
+            str: 最近分配的变更序号，空表时为"0"。
+        """
+        with self._cursor() as cursor:
+            cursor.execute("SELECT value FROM article_change_seq WHERE id = 1")
+            row = cursor.fetchone()
+            return str(row[0] if row else 0)
+
+    @_timed
+    def get_changes(self, since: str, limit: int) -> Tuple[List[dict], str]:
+        """读取游标之后更新过的文章（不含正文），按变更序号升序。
 
+        Args:
+            since: get_change_cursor或上次调用返回的游标，空字符串表示从头开始。
+            limit: 最多返回的数量。
+
+        Returns:
+            Tuple[List[dict], str]: (变更的文章列表, 新游标)。列表附带
+                has_content_en、has_content_zh字段；没有变更时游标不变。
+        """
+        # 无法识别的游标（如旧版本的时间戳游标）从头读取
+        last_seq = int(since) if since.isdigit() else 0
+        with self._cursor() as cursor:
+            cursor.execute(f"""
+                SELECT {", ".join(CHANGE_COLUMNS)},
+                       COALESCE(content_en, '') != '' AS has_content_en,
+                       COALESCE(content_zh, '') != '' AS has_content_zh
+                FROM articles
+                WHERE change_seq > ?
+                ORDER BY change_seq
+                LIMIT ?
+            """, (last_seq, limit))
+            columns = [desc[0] for desc in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+        for row in rows:
+            row["has_content_en"] = bool(row["has_content_en"])
+            row["has_content_zh"] = bool(row["has_content_zh"])
+        if not rows:
+            return rows, since
+        return rows, str(rows[-1]["change_seq"])
+
+    def change_version(self) -> int:
+        """返回本进程内的写入计数，配合wait_for_change使用。"""
+        with self._change_cond:
+            return self._change_version
+
+    def wait_for_change(self, version: int, timeout: float) -> bool:
+        """等待本进程内发生新的写入。
+
+        只能感知当前进程的写入，其他进程（如命令行流水线）的写入需要调用方定期重新查询。
+
+        Args:
+            version: 调用前通过change_version获取的计数。
+            timeout: 最长等待秒数。
+
+        Returns:
+            bool: 期间有新的写入返回True，超时返回False。
+        """
+        with self._change_cond:
+            return self._change_cond.wait_for(lambda: self._change_version != version, timeout)
+
+    def _notify_change(self) -> None:
+        """写入提交后唤醒等待变更的请求。"""
+        with self._change_cond:
+            self._change_version += 1
+            self._change_cond.notify_all()
+
+    @_timed
+    def save_fingerprint(self, article_id: int, fingerprint: int) -> None:
+        """保存文章正文的SimHash指纹及其分段索引。
+
+        Args:
+            article_id: 文章ID。
+            fingerprint: 64位有符号SimHash指纹。
+        """
+        with self._cursor() as cursor:
+            cursor.execute(
+                "UPDATE articles SET simhash = ? WHERE id = ?",
+                (fingerprint, article_id)
+            )
+            cursor.execute(
+                "DELETE FROM article_fingerprints WHERE article_id = ?",
+                (article_id,)
+            )
+            cursor.executemany(
+                "INSERT INTO article_fingerprints (band, value, article_id) VALUES (?, ?, ?)",
+                [(band, value, article_id) for band, value in _fingerprint_bands(fingerprint)]
+            )
+
+    @_timed
+    def get_unfingerprinted_articles(self, limit: int) -> List[dict]:
+        """获取已翻译但还没有SimHash指纹的文章（指纹功能上线前翻译的文章）。
+
+        Args:
+            limit: 最多返回的数量。
+
+        Returns:
+            List[dict]: 包含id、content_en的文章列表，按ID升序。
+        """
+        with self._cursor() as cursor:
+            cursor.execute("""
+                SELECT id, content_en FROM articles
+                WHERE simhash IS NULL
+                  AND content_en IS NOT NULL AND content_en != ''
+                  AND content_zh IS NOT NULL AND content_zh != ''
+                ORDER BY id
+                LIMIT ?
+            """, (limit,))
+            columns = [desc[0] for desc in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    @_timed
+    def save_fingerprints_batch(self, fingerprints: List[Tuple[int, int, str]]) -> None:
+        """在一个事务内批量保存指纹及其分段索引，并补齐缺少的正文哈希。
+
+        Args:
+            fingerprints: (文章ID, 64位有符号SimHash指纹, 正文哈希)列表。
+        """
+        with self._cursor() as cursor:
+            cursor.executemany(
+                "UPDATE articles SET simhash = ?, content_hash = COALESCE(content_hash, ?) WHERE id = ?",
+                [(fingerprint, digest, article_id) for article_id, fingerprint, digest in fingerprints]
+            )
+            cursor.executemany(
+                "DELETE FROM article_fingerprints WHERE article_id = ?",
+                [(article_id,) for article_id, _, _ in fingerprints]
+            )
+            cursor.executemany(
+                "INSERT INTO article_fingerprints (band, value, article_id) VALUES (?, ?, ?)",
+                [
+                    (band, value, article_id)
+                    for article_id, fingerprint, _ in fingerprints
+                    for band, value in _fingerprint_bands(fingerprint)
+                ]
+            )
+
+    @_timed
+    def find_near_duplicates(
+        self,
+        fingerprint: int,
+        max_distance: int,
+        exclude_id: Optional[int] = None
+    ) -> List[dict]:
+        """查找已翻译的近似重复文章。
+
+        先通过分段索引取出候选，再精确计算汉明距离过滤。
+
+        Args:
+            fingerprint: 64位有符号SimHash指纹。
+            max_distance: 允许的最大汉明距离。
+            exclude_id: 可选，排除的文章ID（通常是文章自身）。
+
+        Returns:
+            List[dict]: 文章列表，附带distance字段，按距离升序排列。
+        """
+        bands = _fingerprint_bands(fingerprint)
+        where = " OR ".join(["(f.band = ? AND f.value = ?)"] * len(bands))
+        params = [x for pair in bands for x in pair]
+        with self._cursor() as cursor:
+            cursor.execute(f"""
+                SELECT DISTINCT a.* FROM article_fingerprints f
+                JOIN articles a ON a.id = f.article_id
+                WHERE ({where}) AND a.id != ?
+                  AND a.content_zh IS NOT NULL AND a.content_zh != ''
+            """, params + [exclude_id if exclude_id is not None else -1])
+            columns = [desc[0] for desc in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+        matches = []
+        for row in rows:
+            distance = hamming_distance(row["simhash"], fingerprint)
+            if distance <= max_distance:
+                row["distance"] = distance
+                matches.append(row)
+        return sorted(matches, key=lambda r: r["distance"])
+
+    @_timed
+    def add_llm_call(self, record: dict) -> None:
+        """记录一次大模型调用的路由结果、延迟和成本。
+
+        Args:
+            record: 包含task、model、input_chars、max_tokens、prompt_tokens、
+                completion_tokens、cached_tokens、ttft_ms、latency_ms、cost、ok字段。
+        """
+        with self._cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO llm_calls (
+                    task, model, input_chars, max_tokens, prompt_tokens, completion_tokens,
+                    cached_tokens, ttft_ms, latency_ms, cost, ok, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                record["task"],
+                record["model"],
+                record.get("input_chars"),
+                record.get("max_tokens"),
+                record.get("prompt_tokens"),
+                record.get("completion_tokens"),
+                record.get("cached_tokens"),
+                record.get("ttft_ms"),
+                record.get("latency_ms"),
+                record.get("cost"),
+                1 if record.get("ok") else 0,
+                datetime.now().isoformat()
+            ))
+
+    @_timed
+    def get_llm_call_stats(self, since: str) -> List[dict]:
+        """按任务和模型汇总大模型调用情况。
+
+        Args:
+            since: ISO格式时间，只统计该时间之后的调用。
+
+        Returns:
+            List[dict]: 每个(task, model)的调用次数、失败次数、平均输入长度、
+                前缀缓存命中比例、平均首token延迟、平均/最大耗时和总费用。
+        """
+        with self._cursor() as cursor:
+            cursor.execute("""
+                SELECT task, model,
+                       COUNT(*) AS calls,
+                       SUM(1 - ok) AS errors,
+                       AVG(input_chars) AS avg_input_chars,
+                       SUM(cached_tokens) * 1.0 / NULLIF(SUM(prompt_tokens), 0) AS cached_ratio,
+                       AVG(ttft_ms) AS avg_ttft_ms,
+                       AVG(latency_ms) AS avg_latency_ms,
+                       MAX(latency_ms) AS max_latency_ms,
+                       SUM(cost) AS total_cost
+                FROM llm_calls
+                WHERE created_at >= ?
+                GROUP BY task, model
+                ORDER BY task, model
+            """, (since,))
+            columns = [desc[0] for desc in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    @_timed
+    def get_polish_output(self, prompt_version: str, model: str, content_sha: str) -> Optional[str]:
+        """查询已存储的润色结果。
+
+        Args:
+            prompt_version: 润色提示词版本。
+            model: 润色模型。
+            content_sha: 中文原文的SHA-256。
+
+        Returns:
+            Optional[str]: 润色结果，不存在返回None。
+        """
+        with self._cursor() as cursor:
+            cursor.execute("""
+                SELECT content_polished FROM polish_outputs
+                WHERE prompt_version = ? AND model = ? AND content_sha = ?
+            """, (prompt_version, model, content_sha))
+            row = cursor.fetchone()
+            return row[0] if row else None
+
+    @_timed
+    def save_polish_output(
+        self, prompt_version: str, model: str, content_sha: str, content_polished: str
+    ) -> None:
+        """存储润色结果，相同键已存在时覆盖。
+
+        Args:
+            prompt_version: 润色提示词版本。
+            model: 润色模型。
+            content_sha: 中文原文的SHA-256。
+            content_polished: 润色结果。
+        """
+        with self._cursor() as cursor:
+            cursor.execute("""
+                INSERT OR REPLACE INTO polish_outputs (
+                    prompt_version, model, content_sha, content_polished, created_at
+                ) VALUES (?, ?, ?, ?, ?)
+            """, (prompt_version, model, content_sha, content_polished, datetime.now().isoformat()))
+
+    @_timed
     def delete_article(self, article_id: int) -> bool:
         """删除文章。
 
@@ -264,14 +930,19 @@ class Database:
             bool: 删除成功返回True，否则返回False。
         """
         with self._cursor() as cursor:
+            cursor.execute(
+                "DELETE FROM article_fingerprints WHERE article_id = ?",
+                (article_id,)
+            )
             cursor.execute(
                 "DELETE FROM articles WHERE id = ?",
                 (article_id,)
             )
             return cursor.rowcount > 0
 
+    @_timed
     def get_articles_count(self, status: Optional[str] = None) -> int:
-        """获取文章总数。
+        """获取文章总数（读取触发器维护的统计表，不扫描文章表）。
 
         Args:
             status: 可选，按状态筛选。
@@ -282,13 +953,114 @@ class Database:
         with self._cursor() as cursor:
             if status:
                 cursor.execute(
-                    "SELECT COUNT(*) FROM articles WHERE status = ?",
+                    "SELECT count FROM article_status_counts WHERE status = ?",
                     (status,)
                 )
-            else:
-                cursor.execute("SELECT COUNT(*) FROM articles")
+                row = cursor.fetchone()
+                return row[0] if row else 0
+            cursor.execute("SELECT COALESCE(SUM(count), 0) FROM article_status_counts")
             return cursor.fetchone()[0]
 
+    @_timed
+    def get_stats(self, since_day: str) -> dict:
+        """获取按状态、按天和按待处理阶段的文章数量统计。
+
+        Args:
+            since_day: 日期YYYY-MM-DD，按天统计只返回该日期及之后的数据。
+
+        Returns:
+            dict: 包含total、by_status、by_stage和by_day（按日期升序）的统计结果。
+        """
+        with self._cursor() as cursor:
+            cursor.execute("SELECT status, count FROM article_status_counts WHERE count > 0")
+            by_status = dict(cursor.fetchall())
+            cursor.execute("SELECT stage, count FROM article_stage_counts WHERE count > 0")
+            by_stage = dict(cursor.fetchall())
+            cursor.execute("""
+                SELECT day, status, count FROM article_daily_counts
+                WHERE day >= ? AND count > 0
+                ORDER BY day
+            """, (since_day,))
+            by_day: dict = {}
+            for day, status, count in cursor.fetchall():
+                by_day.setdefault(day, {})[status] = count
+
+        return {
+            "total": sum(by_status.values()),
+            "by_status": by_status,
+            "by_stage": by_stage,
+            "by_day": [{"day": day, "counts": counts} for day, counts in by_day.items()],
+        }
+
+
+def _fingerprint_bands(fingerprint: int) -> List[tuple]:
+    """将64位指纹拆分为(段序号, 16位取值)列表。"""
+    unsigned = fingerprint & 0xFFFFFFFFFFFFFFFF
+    return [(band, (unsigned >> (16 * band)) & 0xFFFF) for band in range(FINGERPRINT_BANDS)]
+
+
+def _add_missing_columns(cursor: sqlite3.Cursor, table: str, columns: tuple) -> None:
+    """通过PRAGMA table_info检查已有字段，只为缺少的字段执行ALTER TABLE。"""
+    cursor.execute(f"PRAGMA table_info({table})")
+    existing = {row[1] for row in cursor.fetchall()}
+    for name, column_type in columns:
+        if name not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
+
+
+def _init_counters(cursor: sqlite3.Cursor) -> None:
+    """创建统计表和维护触发器；触发器首次创建时按现有文章重建统计。"""
+    for sql in COUNTER_TABLES:
+        cursor.execute(sql)
+
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+    existing = {row[0] for row in cursor.fetchall()}
+    missing = [name for name in COUNTER_TRIGGERS if name not in existing]
+    if not missing:
+        return
+
+    for name in missing:
+        cursor.execute(COUNTER_TRIGGERS[name])
+    keys = _counter_keys("articles")
+    cursor.execute("DELETE FROM article_status_counts")
+    cursor.execute("DELETE FROM article_daily_counts")
+    cursor.execute("DELETE FROM article_stage_counts")
+    cursor.execute(f"""
+        INSERT INTO article_status_counts (status, count)
+        SELECT {keys["status"]}, COUNT(*) FROM articles GROUP BY 1
+    """)
+    cursor.execute(f"""
+        INSERT INTO article_daily_counts (day, status, count)
+        SELECT {keys["day"]}, {keys["status"]}, COUNT(*) FROM articles GROUP BY 1, 2
+    """)
+    cursor.execute(f"""
+        INSERT INTO article_stage_counts (stage, count)
+        SELECT {keys["stage"]}, COUNT(*) FROM articles GROUP BY 1
+    """)
+
+
+def _init_change_seq(cursor: sqlite3.Cursor) -> None:
+    """创建变更序号表和分配序号的触发器；首次创建时按更新时间为现有文章补齐序号。"""
+    cursor.execute(CHANGE_SEQ_TABLE)
+
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+    existing = {row[0] for row in cursor.fetchall()}
+    missing = [name for name in CHANGE_SEQ_TRIGGERS if name not in existing]
+    if not missing:
+        return
+
+    cursor.execute("""
+        UPDATE articles SET change_seq = ranked.seq
+        FROM (SELECT id, ROW_NUMBER() OVER (ORDER BY updated_at, id) AS seq FROM articles) AS ranked
+        WHERE articles.id = ranked.id
+    """)
+    cursor.execute("""
+        INSERT OR REPLACE INTO article_change_seq (id, value)
+        SELECT 1, COALESCE(MAX(change_seq), 0) FROM articles
+    """)
+    for name in missing:
+        cursor.execute(CHANGE_SEQ_TRIGGERS[name])
+
 
-# 创建全局数据库实例
+# 创建全局数据库实例（表结构在首次访问数据库时初始化）
 db = Database()
@@ -0,0 +1,138 @@
+"""大模型调用模块。
+
+Translator和Polisher共用的chat.completions调用封装。
+使用流式输出以测量首个token延迟，并从usage中统计token消耗；
+每次调用的路由结果、延迟和成本记录到数据库，用于调整路由规则。
+"""
+import os
+import time
+from typing import TYPE_CHECKING, Dict, List
+
+from config.config import LLM_CONFIG
+from models.database import db
+from src.ai.router import estimate_cost
+from src.metrics import (
+    LLM_ERRORS_TOTAL, LLM_REQUEST_SECONDS, LLM_ROUTE_TOTAL, LLM_TOKENS_TOTAL, LLM_TTFT_SECONDS
+)
+from src.scheduler import llm_limiter
+from src.tracing import span
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+
+def create_client() -> "OpenAI":
+    """创建OpenAI兼容客户端（openai导入较慢，在此处才加载）。"""
+    from openai import OpenAI
+
+    return OpenAI(
+        api_key=os.getenv("DASHSCOPE_API_KEY"),
+        base_url=LLM_CONFIG["base_url"],
+    )
+
+
+def chat_completion(client: "OpenAI", route: Dict, messages: List[Dict], **params) -> str:
+    """按路由结果流式调用chat.completions并返回完整输出，同时记录耗时、token和成本。
+
+    Args:
+        client: OpenAI兼容客户端。
+        route: router.route返回的路由结果，包含task、model、max_tokens、timeout。
+        messages: 对话消息列表。
+        **params: 透传给chat.completions.create的其他参数，如temperature。
+
+    Returns:
+        str: 模型输出内容。
+
+    Raises:
+        Exception: 调用失败时抛出，由调用方处理。
+    """
+    model, task = route["model"], route["task"]
+    LLM_ROUTE_TOTAL.inc(model=model, task=task)
+    # 排队时间计入llm.chat span；interactive通道的调用优先获得该模型的并发名额
+    with span("llm.chat", model=model, task=task, input_chars=route["input_chars"]) as current, \
+            llm_limiter(model).slot():
+        return _stream_completion(client, route, messages, current, **params)
+
+
+def _stream_completion(client: "OpenAI", route: Dict, messages: List[Dict], current, **params) -> str:
+    """执行流式调用，记录指标和调用记录，并将TTFT和token数写入当前span。"""
+    model, task = route["model"], route["task"]
+    # 部分模型（如qwen-mt）的流式输出为非增量式，每个分片都是截至目前的完整结果
+    incremental = model not in LLM_CONFIG["non_incremental_stream_models"]
+
+    start = time.perf_counter()
+    first_token_at = None
+    parts: List[str] = []
+    usage = None
+    ok = False
+    try:
+        stream = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=route["max_tokens"],
+            timeout=route["timeout"],
+            stream=True,
+            stream_options={"include_usage": True},
+            **params,
+        )
+        for chunk in stream:
+            if chunk.usage:
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            content = chunk.choices[0].delta.content
+            if not content:
+                continue
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+                LLM_TTFT_SECONDS.observe(first_token_at - start, model=model, task=task)
+            if incremental:
+                parts.append(content)
+            else:
+                parts = [content]
+        ok = True
+    except Exception:
+        LLM_ERRORS_TOTAL.inc(model=model, task=task)
+        raise
+    finally:
+        latency = time.perf_counter() - start
+        LLM_REQUEST_SECONDS.observe(latency, model=model, task=task)
+
+        prompt_tokens = (usage.prompt_tokens or 0) if usage else 0
+        completion_tokens = (usage.completion_tokens or 0) if usage else 0
+        cached_tokens = _cached_tokens(usage)
+        ttft_ms = round((first_token_at - start) * 1000, 3) if first_token_at else None
+        cost = estimate_cost(model, prompt_tokens, completion_tokens, cached_tokens)
+        if usage:
+            LLM_TOKENS_TOTAL.inc(prompt_tokens, model=model, direction="in")
+            LLM_TOKENS_TOTAL.inc(completion_tokens, model=model, direction="out")
+            LLM_TOKENS_TOTAL.inc(cached_tokens, model=model, direction="cached")
+        if current is not None:
+            current.set(
+                ttft_ms=ttft_ms,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                cached_tokens=cached_tokens,
+                cost=cost,
+            )
+        try:
+            db.add_llm_call(dict(
+                route,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                cached_tokens=cached_tokens,
+                ttft_ms=ttft_ms,
+                latency_ms=round(latency * 1000, 3),
+                cost=cost,
+                ok=ok,
+            ))
+        except Exception as e:
+            print(f"记录大模型调用失败: {e}")
+
+    return "".join(parts)
+
+
+def _cached_tokens(usage) -> int:
+    """从usage.prompt_tokens_details中读取命中前缀缓存的输入token数，不支持的模型返回0。"""
+    details = getattr(usage, "prompt_tokens_details", None) if usage else None
+    return (getattr(details, "cached_tokens", None) or 0) if details else 0
@@ -2,40 +2,17 @@
 
 使用阿里云通义千问API实现文章润色功能。
 负责将中文文章润色为适合今日头条发布的风格。
+固定的润色要求放在system消息中作为稳定前缀，以命中服务端前缀缓存；
+润色结果按(提示词版本, 模型, 原文哈希)存储，相同输入直接返回已有结果。
 """
-import os
-from typing import Optional
+import hashlib
 
-from dotenv import load_dotenv
-from openai import OpenAI
+from models.database import db
+from src.ai.client import chat_completion, create_client
+from src.ai.router import route
+from src.metrics import CACHE_EVENTS_TOTAL
 
-load_dotenv()
-
-
-class Polisher:
-    """文章润色器，使用通义千问API将中文文章润色为适合今日头条发布的风格。"""
-
-    def __init__(self):
-        """初始化润色器。"""
-        self.client = OpenAI(
-            api_key=os.getenv("DASHSCOPE_API_KEY"),
-            base_url="https://dashscope.aliyuncs.com/compatible-mode/v1",
-        )
-        self.model = "qwen3-max"
-
-    def polish(self, text: str) -> str:
-        """润色中文文章。
-
-        Args:
-            text: 待润色的中文文章。
-
-        Returns:
-            str: 润色后的中文文章。
-        """
-        if not text:
-            return ""
-
-        prompt = f"""你是一名资深国际政治评论员，现需撰写一篇适合在今日头条发布的原创时事评论文章。请严格遵循以下要求：
+POLISH_SYSTEM_PROMPT = """你是一名资深国际政治评论员，现需撰写一篇适合在今日头条发布的原创时事评论文章。请严格遵循以下要求：
 
 1. **内容来源处理**：
    - 基于用户提供的外媒报道（如BBC、CNN等）中的**公开事实信息**（如民调数据、政策事件、时间、人物言论等）进行整合；
@@ -65,26 +42,53 @@ class Polisher:
    - 不得使用"编译""据XX报道""XX称"作为段落主干；
    - 不得照搬原文结构或修辞模式。
 
-请根据以上准则，将以下原文润色为符合今日头条调性的原创评论文章：
+请根据以上准则，将用户提供的原文润色为符合今日头条调性的原创评论文章。
+请直接输出润色后的文章内容，不要包含任何解释或前缀。"""
 
-原文如下：
-{text}
+# 提示词版本由提示词内容派生，修改提示词后旧的润色结果自动失效
+PROMPT_VERSION = hashlib.sha256(POLISH_SYSTEM_PROMPT.encode("utf-8")).hexdigest()[:12]
 
-请直接输出润色后的文章内容，不要包含任何解释或前缀。"""
 
+class Polisher:
+    """文章润色器，使用通义千问API将中文文章润色为适合今日头条发布的风格。"""
+
+    def __init__(self):
+        """初始化润色器。"""
+        self.client = create_client()
+
+    def polish(self, text: str) -> str:
+        """润色中文文章，相同提示词版本、模型和原文的结果直接从存储中返回。
+
+        Args:
+            text: 待润色的中文文章。
+
+        Returns:
+            str: 润色后的中文文章。
+        """
+        if not text:
+            return ""
+
+        selected = route("polish", text)
+        content_sha = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        stored = db.get_polish_output(PROMPT_VERSION, selected["model"], content_sha)
+        CACHE_EVENTS_TOTAL.inc(cache="polish_output", result="hit" if stored else "miss")
+        if stored:
+            return stored
+
+        messages = [
+            {"role": "system", "content": POLISH_SYSTEM_PROMPT},
+            {"role": "user", "content": f"原文如下：\n{text}"},
+        ]
         try:
-            completion = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-            )
-            return completion.choices[0].message.content or ""
+            result = chat_completion(self.client, selected, messages, temperature=0.7)
         except Exception as e:
             print(f"润色失败: {e}")
             return ""
 
+        if result:
+            db.save_polish_output(PROMPT_VERSION, selected["model"], content_sha, result)
+        return result
+
 
 def polish_text(text: str) -> str:
     """润色文本（供命令行或外部调用）。"""
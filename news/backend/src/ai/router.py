@@ -0,0 +1,86 @@
+"""模型路由模块。
+
+根据任务类型（标题、正文块、润色）和输入长度选择模型、max_tokens和超时，
+短输入使用更快的小模型，长输入使用旗舰模型。规则在config.py的LLM_ROUTING中配置。
+"""
+from typing import Dict, List
+
+from config.config import LLM_OUTPUT_ESTIMATE, LLM_PRICING, LLM_ROUTING, TRANSLATE_CHUNK_CONFIG
+from src.dedup import split_paragraphs
+
+
+def route(task: str, text: str) -> Dict:
+    """为一次调用选择模型和生成参数。
+
+    Args:
+        task: 任务类型，title、body或polish。
+        text: 输入文本。
+
+    Returns:
+        Dict: 包含task、model、max_tokens、timeout、input_chars的路由结果。
+    """
+    length = len(text)
+    rules = LLM_ROUTING[task]
+    rule = next(
+        (r for r in rules if r["max_chars"] is None or length <= r["max_chars"]),
+        rules[-1]
+    )
+
+    max_tokens = rule["max_tokens"]
+    if task in ("title", "body"):
+        # 翻译输出长度与输入成正比，按输入长度收紧上限，避免异常输出拖长延迟
+        estimate = int(length * LLM_OUTPUT_ESTIMATE["tokens_per_char"]) + LLM_OUTPUT_ESTIMATE["margin"]
+        max_tokens = min(max_tokens, estimate)
+
+    return {
+        "task": task,
+        "model": rule["model"],
+        "max_tokens": max_tokens,
+        "timeout": rule["timeout"],
+        "input_chars": length,
+    }
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float:
+    """按LLM_PRICING估算一次调用的费用（元），未配置价格的模型返回0。
+
+    cached_tokens为prompt_tokens中命中前缀缓存的部分，按cached_input价格计算。
+    """
+    price = LLM_PRICING.get(model)
+    if not price:
+        return 0.0
+    cached_price = price.get("cached_input", price["input"])
+    return (
+        (prompt_tokens - cached_tokens) * price["input"]
+        + cached_tokens * cached_price
+        + completion_tokens * price["output"]
+    ) / 1_000_000
+
+
+def split_chunks(text: str) -> List[str]:
+    """按段落将长正文切分为不超过TRANSLATE_CHUNK_CONFIG["max_chars"]的块。
+
+    单个段落超过上限时单独成块，不在段落中间切断。
+
+    Args:
+        text: 英文正文。
+
+    Returns:
+        List[str]: 文本块列表，未超过上限时只有一块。
+    """
+    limit = TRANSLATE_CHUNK_CONFIG["max_chars"]
+    if len(text) <= limit:
+        return [text]
+
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for paragraph in split_paragraphs(text):
+        if current and size + len(paragraph) + 2 > limit:
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+        current.append(paragraph)
+        size += len(paragraph) + 2
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
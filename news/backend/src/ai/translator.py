@@ -2,14 +2,15 @@
 
 使用阿里云通义千问API实现英译中功能。
 只负责翻译，不涉及数据库操作。
+按任务类型和长度路由模型，长正文按段落分块并发翻译。
 """
-import os
-from typing import Optional
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
 
-from dotenv import load_dotenv
-from openai import OpenAI
-
-load_dotenv()
+from config.config import TRANSLATE_CHUNK_CONFIG, TRANSLATE_TITLE_CONFIG
+from src.ai.client import chat_completion, create_client
+from src.ai.router import route, split_chunks
 
 
 class Translator:
@@ -17,24 +18,60 @@ class Translator:
 
     def __init__(self):
         """初始化翻译器。"""
-        self.client = OpenAI(
-            api_key=os.getenv("DASHSCOPE_API_KEY"),
-            base_url="https://dashscope.aliyuncs.com/compatible-mode/v1",
-        )
-        self.model = "qwen-mt-plus"
+        self.client = create_client()
 
-    def translate(self, text: str) -> str:
+    def translate(self, text: str, task: str = "body") -> str:
         """将英文翻译成中文。
 
         Args:
             text: 待翻译的英文文本。
+            task: 任务类型，title为标题，body为正文（超长时分块翻译）。
 
         Returns:
-            str: 翻译后的中文文本。
+            str: 翻译后的中文文本，任一分块失败时返回空字符串。
         """
         if not text:
             return ""
 
+        chunks = split_chunks(text) if task == "body" else [text]
+        if len(chunks) == 1:
+            return self._translate_chunk(text, task)
+
+        workers = min(TRANSLATE_CHUNK_CONFIG["concurrency"], len(chunks))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # 每个分块在复制的上下文中执行，使分块调用挂在当前trace下
+            futures = [
+                executor.submit(contextvars.copy_context().run, self._translate_chunk, chunk, task)
+                for chunk in chunks
+            ]
+            results = [future.result() for future in futures]
+
+        if not all(results):
+            return ""
+        return "\n\n".join(results)
+
+    def translate_titles(self, titles: List[str]) -> List[str]:
+        """并发翻译多个标题。
+
+        Args:
+            titles: 英文标题列表。
+
+        Returns:
+            List[str]: 与输入顺序一致的中文标题，失败的为空字符串。
+        """
+        if not titles:
+            return []
+        workers = min(TRANSLATE_TITLE_CONFIG["concurrency"], len(titles))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # 复制上下文，使调用沿用当前请求的调度通道和trace
+            futures = [
+                executor.submit(contextvars.copy_context().run, self.translate, title, "title")
+                for title in titles
+            ]
+            return [future.result() for future in futures]
+
+    def _translate_chunk(self, text: str, task: str) -> str:
+        """翻译单个文本块，失败时返回空字符串。"""
         messages = [
             {
                 "role": "user",
@@ -43,12 +80,7 @@ class Translator:
         ]
 
         try:
-            completion = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=0.3,
-            )
-            return completion.choices[0].message.content or ""
+            return chat_completion(self.client, route(task, text), messages, temperature=0.3)
         except Exception as e:
             print(f"翻译失败: {e}")
             return ""
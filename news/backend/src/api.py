@@ -3,8 +3,9 @@
 提供新闻列表、搜索、爬取、翻译等API接口。
 """
 import asyncio
-from datetime import datetime
-from flask import Flask, jsonify, request
+import time
+from datetime import datetime, timedelta
+from flask import Flask, Response, g, jsonify, request, send_file, stream_with_context
 from flask_cors import CORS
 
 import sys
@@ -13,15 +14,74 @@ import os
 # 添加项目根目录到Python路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from config.config import BATCH_CONFIG, CHANGES_CONFIG, IMAGE_CONFIG
 from models.database import db
 from src.crawler import BBCCrawler
-from src.article_fetcher import ArticleFetcher
 from src.ai.translator import Translator
-from src.ai.polisher import Polisher
+from src.batch import BatchRunner
+from src.export import encode_ndjson
+from src.image_cache import ImageUnavailable, image_cache
+from src.metrics import HTTP_REQUEST_SECONDS, render_metrics
+from src.tracing import begin_span, current_span, end_span
+from src.pipeline import NewsPipeline
+from src.scheduler import INTERACTIVE, reset_lane, set_lane
 
 app = Flask(__name__)
 CORS(app)
 
+batch_runner = BatchRunner({
+    "fetch": NewsPipeline.fetch_and_save,
+    "translate": NewsPipeline.translate_and_save,
+    "fetch-and-translate": NewsPipeline.fetch_and_translate,
+    "polish": NewsPipeline.polish_and_save,
+})
+
+
+@app.before_request
+def _start_timer():
+    """记录请求开始时间，开启该请求的trace（可通过X-Trace-Id请求头指定ID），
+    并将请求内占用的浏览器和大模型名额标记为interactive优先级"""
+    g.request_start = time.perf_counter()
+    g.lane_token = set_lane(INTERACTIVE)
+    g.trace_span, g.trace_token = begin_span(
+        f"http {request.method} {request.path}",
+        trace_id=request.headers.get("X-Trace-Id"),
+        method=request.method, path=request.path
+    )
+
+
+@app.after_request
+def _record_latency(response):
+    """按路由模板记录接口耗时，避免文章ID等路径参数导致标签爆炸"""
+    if "request_start" in g:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - g.request_start,
+            method=request.method, route=route, status=response.status_code
+        )
+    if g.get("trace_span") is not None:
+        g.trace_span.set(status=response.status_code)
+        response.headers["X-Trace-Id"] = g.trace_span.trace_id
+    return response
+
+
+@app.teardown_request
+def _finish_trace(error=None):
+    """结束请求trace，超过慢请求阈值时写入日志"""
+    if g.get("trace_span") is not None:
+        end_span(g.pop("trace_span"), g.pop("trace_token"), error)
+    if g.get("lane_token") is not None:
+        try:
+            reset_lane(g.pop("lane_token"))
+        except ValueError:
+            pass  # token来自其他上下文，请求线程结束后通道随上下文一起丢弃
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Prometheus格式的运行指标"""
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4; charset=utf-8")
+
 
 @app.route("/api/articles", methods=["GET"])
 def get_articles():
@@ -31,26 +91,88 @@ def get_articles():
     page = int(request.args.get("page", 1))
     page_size = int(request.args.get("page_size", 10))
 
+    # 先取游标再查询列表，列表之后的写入都能通过变更订阅拿到
+    cursor = db.get_change_cursor()
+    start = (page - 1) * page_size
     if keyword:
         articles = db.search_articles(keyword)
+        total = len(articles)
+        articles = articles[start:start + page_size]
     else:
-        articles = db.get_all_articles(status=status if status else None)
-
-    start = (page - 1) * page_size
-    end = start + page_size
-    total = len(articles)
+        # 只读取当前页，总数来自触发器维护的统计表
+        articles = db.get_all_articles(status=status or None, limit=page_size, offset=start)
+        total = db.get_articles_count(status or None)
 
     return jsonify({
         "code": 0,
         "data": {
-            "list": articles[start:end],
+            "list": articles,
             "total": total,
             "page": page,
-            "page_size": page_size
+            "page_size": page_size,
+            "cursor": cursor
+        }
+    })
+
+
+@app.route("/api/articles/changes", methods=["GET"])
+def get_article_changes():
+    """增量获取since游标之后更新的文章（不含正文），wait>0时没有变更则长轮询等待"""
+    since = request.args.get("since", "")
+    limit = min(int(request.args.get("limit", CHANGES_CONFIG["page_size"])), CHANGES_CONFIG["page_size"])
+    wait = min(float(request.args.get("wait", 0)), CHANGES_CONFIG["max_wait"])
+
+    started = time.monotonic()
+    deadline = started + wait
+    while True:
+        version = db.change_version()
+        changes, cursor = db.get_changes(since, limit)
+        remaining = deadline - time.monotonic()
+        if changes or remaining <= 0:
+            break
+        # 本进程写入时立即唤醒；其他进程的写入靠定期重新查询发现
+        db.wait_for_change(version, min(remaining, CHANGES_CONFIG["poll_interval"]))
+
+    # 长轮询的等待时间不算作慢请求
+    trace = current_span()
+    if trace is not None and wait:
+        trace.set(wait_ms=round((time.monotonic() - started) * 1000, 3))
+
+    return jsonify({
+        "code": 0,
+        "data": {
+            "list": changes,
+            "cursor": cursor,
+            "has_more": len(changes) == limit
         }
     })
 
 
+@app.route("/api/export", methods=["GET"])
+def export_articles():
+    """流式导出文章为NDJSON，支持status、since、until筛选，gzip=1时压缩"""
+    compress = request.args.get("gzip") in ("1", "true")
+    articles = db.iter_articles(
+        status=request.args.get("status") or None,
+        since=request.args.get("since") or None,
+        until=request.args.get("until") or None,
+    )
+    filename = "articles.jsonl.gz" if compress else "articles.jsonl"
+    return Response(
+        stream_with_context(encode_ndjson(articles, compress=compress)),
+        mimetype="application/gzip" if compress else "application/x-ndjson",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
+@app.route("/api/stats", methods=["GET"])
+def get_stats():
+    """文章数量统计：按状态、按待处理阶段，以及最近days天按天的数量"""
+    days = int(request.args.get("days", 30))
+    since_day = (datetime.now() - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+    return jsonify({"code": 0, "data": db.get_stats(since_day)})
+
+
 @app.route("/api/articles/<int:article_id>", methods=["GET"])
 def get_article(article_id):
     """获取单篇文章详情"""
@@ -60,20 +182,46 @@ def get_article(article_id):
     return jsonify({"code": 0, "data": article})
 
 
+@app.route("/api/images/<int:article_id>", methods=["GET"])
+def get_article_image(article_id):
+    """获取文章配图的缓存版本，variant为thumb（列表缩略图）或detail（详情图）"""
+    variant = request.args.get("variant", "thumb")
+    if variant not in IMAGE_CONFIG["variants"]:
+        return jsonify({"code": 1, "message": f"不支持的尺寸: {variant}"}), 400
+
+    article = db.get_article_by_id(article_id)
+    if not article or not article.get("image_url"):
+        return jsonify({"code": 1, "message": "文章没有配图"}), 404
+
+    try:
+        path, mimetype, etag = image_cache.get(article["image_url"], variant)
+    except ImageUnavailable:
+        # 最近失败过，直接返回，不再等待上游
+        return jsonify({"code": 1, "message": "获取图片失败"}), 502
+    except Exception as e:
+        print(f"获取图片失败: {e}")
+        return jsonify({"code": 1, "message": "获取图片失败"}), 502
+
+    # conditional=True时根据If-None-Match返回304
+    response = send_file(path, mimetype=mimetype, etag=etag, max_age=IMAGE_CONFIG["max_age"], conditional=True)
+    response.cache_control.public = True
+    return response
+
+
 @app.route("/api/crawl", methods=["POST"])
 def crawl_news():
-    """爬取最新新闻（自动翻译标题）"""
+    """爬取所有配置来源的最新新闻（自动翻译标题）"""
     async def _crawl():
         crawler = BBCCrawler()
-        articles = await crawler.fetch_most_read()
+        articles = await crawler.fetch_all()
         return articles
 
     articles = asyncio.run(_crawl())
     
-    # 翻译标题
-    translator = Translator()
-    for article in articles:
-        title_zh = translator.translate(article["title_en"])
+    # 只为尚未入库的新闻翻译标题，并发请求以免逐条等待超过前端超时
+    articles = [a for a in articles if not db.article_exists(a["url"])]
+    titles_zh = Translator().translate_titles([a["title_en"] for a in articles])
+    for article, title_zh in zip(articles, titles_zh):
         article["title_zh"] = title_zh
     
     # 保存到数据库
@@ -93,13 +241,7 @@ def fetch_article_content(article_id):
     if not article:
         return jsonify({"code": 1, "message": "文章不存在"}), 404
 
-    async def _fetch():
-        fetcher = ArticleFetcher()
-        return await fetcher.fetch_content(article["url"])
-
-    result = asyncio.run(_fetch())
-    if result:
-        db.update_article(article_id, result)
+    if NewsPipeline.fetch_and_save(article):
         updated_article = db.get_article_by_id(article_id)
         return jsonify({"code": 0, "message": "获取成功", "data": updated_article})
     return jsonify({"code": 1, "message": "获取失败"}), 500
@@ -112,19 +254,8 @@ def translate_article(article_id):
     if not article:
         return jsonify({"code": 1, "message": "文章不存在"}), 404
 
-    translator = Translator()
-
-    title_zh = translator.translate(article["title_en"])
-    content_zh = ""
-    if article.get("content_en"):
-        content_zh = translator.translate(article["content_en"])
-
-    db.update_article(article_id, {
-        "title_zh": title_zh,
-        "content_zh": content_zh,
-        "status": "translated",
-        "translated_at": datetime.now().isoformat()
-    })
+    if not NewsPipeline.translate_and_save(article):
+        return jsonify({"code": 1, "message": "翻译失败或原文已更新，请重试"}), 409
 
     updated_article = db.get_article_by_id(article_id)
     return jsonify({"code": 0, "message": "翻译成功", "data": updated_article})
@@ -137,35 +268,12 @@ def fetch_and_translate(article_id):
     if not article:
         return jsonify({"code": 1, "message": "文章不存在"}), 404
 
-    result = None
-    
-    # 如果没有英文内容，先获取
-    if not article.get("content_en"):
-        async def _fetch():
-            fetcher = ArticleFetcher()
-            return await fetcher.fetch_content(article["url"])
-
-        result = asyncio.run(_fetch())
-        if not result:
-            return jsonify({"code": 1, "message": "获取内容失败"}), 500
-
-        db.update_article(article_id, result)
-    else:
-        result = {"content_en": article.get("content_en")}
-
-    # 翻译标题和内容
-    translator = Translator()
-    title_zh = translator.translate(article["title_en"])
-    content_zh = ""
-    if result.get("content_en"):
-        content_zh = translator.translate(result["content_en"])
-
-    db.update_article(article_id, {
-        "title_zh": title_zh,
-        "content_zh": content_zh,
-        "status": "translated",
-        "translated_at": datetime.now().isoformat()
-    })
+    # 如果没有英文内容先获取，翻译时优先复用近似重复文章的译文
+    if not NewsPipeline.fetch_and_translate(article):
+        # 已有原文说明获取成功，是翻译失败或原文在翻译期间被更新
+        if (db.get_article_by_id(article_id) or {}).get("content_en"):
+            return jsonify({"code": 1, "message": "翻译失败或原文已更新，请重试"}), 409
+        return jsonify({"code": 1, "message": "获取内容失败"}), 500
 
     updated_article = db.get_article_by_id(article_id)
     return jsonify({"code": 0, "message": "处理成功", "data": updated_article})
@@ -182,28 +290,43 @@ def polish_article(article_id):
         return jsonify({"code": 1, "message": "请先翻译文章内容"}), 400
 
     print(f"开始润色文章 {article_id}，内容长度: {len(article['content_zh'])}")
-    
-    polisher = Polisher()
-    content_polished = polisher.polish(article["content_zh"])
-    
-    print(f"润色完成，结果长度: {len(content_polished) if content_polished else 0}")
 
-    if not content_polished:
+    if not NewsPipeline.polish_and_save(article):
         return jsonify({"code": 1, "message": "润色失败"}), 500
 
-    db.update_article(article_id, {
-        "content_polished": content_polished,
-        "polished_at": datetime.now().isoformat(),
-        "status": "polished"
-    })
-    print(f"已保存到数据库")
-
     # 返回更新后的完整文章数据
     updated_article = db.get_article_by_id(article_id)
-    print(f"读取返回数据，content_polished 长度: {len(updated_article.get('content_polished', '')) if updated_article else 0}")
-    
+    print(f"润色完成，content_polished 长度: {len(updated_article.get('content_polished') or '')}")
+
     return jsonify({"code": 0, "message": "润色成功", "data": updated_article})
 
 
+@app.route("/api/articles/batch/<operation>", methods=["POST"])
+def submit_batch(operation):
+    """提交批量任务：按ID列表或状态筛选，在后台并发处理多篇文章"""
+    if operation not in batch_runner.operations:
+        return jsonify({"code": 1, "message": f"不支持的操作: {operation}"}), 404
+
+    payload = request.get_json(silent=True) or {}
+    max_items = BATCH_CONFIG["max_items"]
+    if payload.get("ids"):
+        article_ids = [int(i) for i in payload["ids"]][:max_items]
+    else:
+        limit = min(int(payload.get("limit", max_items)), max_items)
+        article_ids = db.get_article_ids(status=payload.get("status") or None, limit=limit)
+
+    job = batch_runner.submit(operation, article_ids)
+    return jsonify({"code": 0, "message": f"已提交 {len(job.items)} 篇文章", "data": job.to_dict()})
+
+
+@app.route("/api/articles/batch/jobs/<job_id>", methods=["GET"])
+def get_batch_job(job_id):
+    """查询批量任务进度"""
+    job = batch_runner.get(job_id)
+    if not job:
+        return jsonify({"code": 1, "message": "任务不存在"}), 404
+    return jsonify({"code": 0, "data": job.to_dict()})
+
+
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5001, debug=True)
+    app.run(host="0.0.0.0", port=5001, debug=True, threaded=True)
@@ -1,70 +1,106 @@
 """文章内容获取模块。
 
 通过Playwright访问BBC文章链接，获取完整的文章内容。
+页面HTML归档保存后再解析，选择器调整后可以离线重新解析。
 只负责数据爬取，不涉及数据库操作。
 """
 import asyncio
-from datetime import datetime
 from typing import Dict, Optional, List
 
-from playwright.async_api import async_playwright
+
+from src.html_archive import HtmlArchive
+from src.metrics import BROWSER_SECONDS
+from src.scheduler import browser_limiter
+from src.tracing import span
+
+
+def extract_article(html: str) -> Dict:
+    """从文章页面HTML中解析正文、图片和发布时间。
+
+    在线抓取和离线重新解析共用该函数，保证两者结果一致。
+
+    Args:
+        html: 文章页面HTML。
+
+    Returns:
+        Dict: 包含content_en、image_url、published_at的字典。
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+
+    content_parts: List[str] = []
+    image_url = ""
+
+    published_at = ""
+    time_elem = soup.select_one('[data-component="byline-block"] time')
+    if time_elem:
+        published_at = time_elem.get("datetime") or ""
+
+    for block in soup.select('[data-component="text-block"], [data-component="image-block"]'):
+        if block.get("data-component") == "text-block":
+            paragraphs = [p.get_text().strip() for p in block.find_all("p")]
+            text = "\n".join(p for p in paragraphs if p) or block.get_text().strip()
+            if text:
+                content_parts.append(text)
+            continue
+
+        img_elem = block.find("img")
+        if img_elem and not image_url:
+            image_url = img_elem.get("src") or ""
+
+    return {
+        "content_en": "\n\n".join(content_parts),
+        "image_url": image_url,
+        "published_at": published_at,
+    }
 
 
 class ArticleFetcher:
     """文章内容获取器，负责获取单篇文章的详细内容。"""
 
+    def __init__(self, archive: Optional[HtmlArchive] = None):
+        """初始化获取器。
+
+        Args:
+            archive: 可选，HTML归档存储，默认使用config中配置的目录。
+        """
+        self.archive = archive or HtmlArchive()
+
     async def fetch_content(self, url: str) -> Optional[Dict]:
         """获取单篇文章的详细内容。
 
-        使用Playwright访问文章URL，解析HTML获取文章标题、正文、图片等。
+        使用Playwright访问文章URL，归档页面HTML后解析文章正文、图片等。
 
         Args:
             url: 文章链接。
 
         Returns:
-            Optional[Dict]: 包含文章内容的字典，失败返回None。
+            Optional[Dict]: 包含文章内容和html_sha(归档键)的字典，失败返回None。
         """
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
-
-            try:
-                await page.goto(url, wait_until="domcontentloaded", timeout=60000)
-                await page.wait_for_timeout(3000)
+        # Playwright导入较慢，只在确实需要浏览器时加载
+        from playwright.async_api import async_playwright
 
-                content_parts: List[str] = []
-                image_url = ""
+        # 浏览器会话按调度通道分配，API手动操作优先于批量任务
+        async with browser_limiter.async_slot(), async_playwright() as p:
+            with BROWSER_SECONDS.time(component="fetcher", stage="launch"), span("fetcher.launch"):
+                browser = await p.chromium.launch(headless=True)
+                page = await browser.new_page()
 
-                content_blocks = await page.query_selector_all(
-                    '[data-component="text-block"], [data-component="image-block"]'
-                )
-
-                published_at = ""
-                time_elem = await page.query_selector('[data-component="byline-block"] time')
-                if time_elem:
-                    published_at = await time_elem.get_attribute('datetime') or ""
-
-                for block in content_blocks:
-                    if await block.get_attribute('data-component') == 'text-block':
-                        text = await block.inner_text()
-                        if text:
-                            content_parts.append(text)
-                        continue
-
-                    if await block.get_attribute('data-component') == 'image-block':
-                        img_elem = await block.query_selector('img')
-                        if img_elem and not image_url:
-                            image_url = await img_elem.get_attribute("src") or ""
-
-                content = "\n\n".join(content_parts)
+            try:
+                with BROWSER_SECONDS.time(component="fetcher", stage="navigate"), span("fetcher.navigate"):
+                    await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+                with BROWSER_SECONDS.time(component="fetcher", stage="wait"), span("fetcher.wait"):
+                    await page.wait_for_timeout(3000)
 
+                html = await page.content()
                 await browser.close()
 
-                return {
-                    "content_en": content,
-                    "image_url": image_url,
-                    "published_at": published_at,
-                }
+                with BROWSER_SECONDS.time(component="fetcher", stage="extract"), span("fetcher.extract"):
+                    result = extract_article(html)
+                with span("fetcher.archive", bytes=len(html)):
+                    result["html_sha"] = self.archive.put(html)
+                return result
 
             except Exception as e:
                 print(f"获取文章内容失败: {e}")
@@ -0,0 +1,141 @@
+"""批量任务模块。
+
+在后台线程池中并发处理多篇文章的获取、翻译、润色，并记录每篇文章的进度，
+供API轮询查询。任务只保存在内存中，服务重启后丢失。
+"""
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from config.config import BATCH_CONFIG
+from models.database import db
+from src.metrics import QUEUE_DEPTH
+from src.scheduler import BULK, lane
+from src.tracing import span
+
+
+class BatchJob:
+    """单个批量任务，记录每篇文章的处理状态。"""
+
+    def __init__(self, operation: str, article_ids: List[int]):
+        """初始化任务。
+
+        Args:
+            operation: 操作名称，如fetch、translate。
+            article_ids: 待处理的文章ID列表。
+        """
+        self.id = uuid.uuid4().hex
+        self.operation = operation
+        self.created_at = datetime.now().isoformat()
+        self.finished_at: Optional[str] = None
+        self.items: Dict[int, Dict] = {
+            article_id: {"status": "pending", "message": "", "started_at": None, "finished_at": None}
+            for article_id in article_ids
+        }
+        self._lock = threading.Lock()
+
+    def update(self, article_id: int, **fields) -> None:
+        """更新单篇文章的处理状态。"""
+        with self._lock:
+            self.items[article_id].update(fields)
+
+    def to_dict(self) -> Dict:
+        """转换为可JSON序列化的字典，附带各状态的汇总数量。"""
+        with self._lock:
+            items = [dict(item, article_id=article_id) for article_id, item in self.items.items()]
+        summary = {status: 0 for status in ("pending", "running", "done", "failed")}
+        for item in items:
+            summary[item["status"]] += 1
+        return {
+            "id": self.id,
+            "operation": self.operation,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "total": len(items),
+            "summary": summary,
+            "items": items,
+        }
+
+
+class BatchRunner:
+    """批量任务执行器，所有任务共用一个有并发上限的线程池。"""
+
+    def __init__(self, operations: Dict[str, Callable[[Dict], bool]], concurrency: Optional[int] = None):
+        """初始化执行器。
+
+        Args:
+            operations: 操作名称到处理函数的映射，处理函数接收文章数据，成功返回True。
+            concurrency: 同时处理的文章数量上限，默认为config中的配置。
+        """
+        self.operations = operations
+        self.executor = ThreadPoolExecutor(
+            max_workers=concurrency or BATCH_CONFIG["concurrency"],
+            thread_name_prefix="batch"
+        )
+        self.jobs: Dict[str, BatchJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, operation: str, article_ids: List[int]) -> BatchJob:
+        """提交批量任务，立即返回，文章在后台并发处理。
+
+        Args:
+            operation: 操作名称，必须是operations中的键。
+            article_ids: 待处理的文章ID列表（重复ID只处理一次）。
+
+        Returns:
+            BatchJob: 新建的任务。
+        """
+        handler = self.operations[operation]
+        job = BatchJob(operation, list(dict.fromkeys(article_ids)))
+
+        with self._lock:
+            self.jobs[job.id] = job
+            self._prune()
+
+        remaining = [len(job.items)]
+        remaining_lock = threading.Lock()
+
+        def _run(article_id: int) -> None:
+            QUEUE_DEPTH.dec(queue=f"batch_{operation}", state="pending")
+            QUEUE_DEPTH.inc(queue=f"batch_{operation}", state="running")
+            job.update(article_id, status="running", started_at=datetime.now().isoformat())
+            try:
+                # 每篇文章作为独立的trace记录，按bulk优先级占用共享资源
+                with lane(BULK), span(f"batch.{operation}", job_id=job.id, article_id=article_id):
+                    article = db.get_article_by_id(article_id)
+                    if not article:
+                        job.update(article_id, status="failed", message="文章不存在")
+                    elif handler(article):
+                        job.update(article_id, status="done")
+                    else:
+                        job.update(article_id, status="failed", message="处理失败")
+            except Exception as e:
+                print(f"批量任务 {job.id} 处理文章 {article_id} 失败: {e}")
+                job.update(article_id, status="failed", message=str(e))
+            finally:
+                QUEUE_DEPTH.dec(queue=f"batch_{operation}", state="running")
+                job.update(article_id, finished_at=datetime.now().isoformat())
+                with remaining_lock:
+                    remaining[0] -= 1
+                    if remaining[0] == 0:
+                        job.finished_at = datetime.now().isoformat()
+
+        if not job.items:
+            job.finished_at = datetime.now().isoformat()
+        QUEUE_DEPTH.inc(len(job.items), queue=f"batch_{operation}", state="pending")
+        for article_id in job.items:
+            self.executor.submit(_run, article_id)
+        return job
+
+    def get(self, job_id: str) -> Optional[BatchJob]:
+        """根据ID获取任务。"""
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def _prune(self) -> None:
+        """只保留最近的若干个已完成任务，避免内存无限增长。"""
+        finished = [j for j in self.jobs.values() if j.finished_at]
+        for job in finished[:max(0, len(finished) - BATCH_CONFIG["keep_jobs"])]:
+            del self.jobs[job.id]
@@ -1,89 +1,287 @@
 """BBC新闻爬虫模块。
 
-使用Playwright爬取BBC新闻首页的Most Read区域。
+使用Playwright爬取BBC新闻首页的Most Read区域和各栏目页，
+使用流式XML解析读取RSS/Atom订阅源。
 只负责数据爬取，不涉及数据库操作。
 """
 import asyncio
+import io
+import xml.etree.ElementTree as ET
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 
-from playwright.async_api import async_playwright
+from config.config import CRAWLER_CONFIG
+from src.metrics import BROWSER_SECONDS
+from src.scheduler import browser_limiter
+from src.tracing import span
+
+
+def normalize_url(url: str) -> str:
+    """规范化文章链接，避免同一篇文章因链接写法不同而重复入库。
+
+    统一协议和主机名，去除锚点、跟踪参数和末尾斜杠，剩余查询参数按名称排序。
+
+    Args:
+        url: 原始链接，可以是以/开头的站内相对路径。
+
+    Returns:
+        str: 规范化后的链接。
+    """
+    url = url.strip()
+    if url.startswith("//"):
+        url = "https:" + url
+    elif url.startswith("/"):
+        url = "https://" + CRAWLER_CONFIG["canonical_host"] + url
+
+    parts = urlsplit(url)
+    host = parts.hostname or ""
+    if host in CRAWLER_CONFIG["host_aliases"]:
+        host = CRAWLER_CONFIG["canonical_host"]
+
+    tracking = set(CRAWLER_CONFIG["tracking_params"])
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k not in tracking and not k.startswith("utm_")
+    ]
+    path = parts.path.rstrip("/") or "/"
+
+    return urlunsplit(("https", host, path, urlencode(sorted(query)), ""))
 
 
 class BBCCrawler:
-    """BBC新闻爬虫类，负责爬取BBC首页的Most Read新闻。"""
+    """BBC新闻爬虫类，负责爬取BBC首页Most Read、栏目页和RSS订阅源中的新闻。"""
 
     URL = "https://www.bbc.com/news"
 
+    MOST_READ_SELECTORS = [
+        'section[data-testid="illinois-section-outer-10"]',
+        'section[data-analytics_group_name="Most read"]',
+        '[data-analytics_group_name="Most read"]',
+    ]
+
+    def __init__(self, sources: Optional[List[Dict]] = None):
+        """初始化爬虫。
+
+        Args:
+            sources: 爬取来源列表，默认为config中配置的来源。
+        """
+        self.sources = sources or CRAWLER_CONFIG["sources"]
+
     async def fetch_most_read(self) -> List[Dict]:
         """获取BBC首页Most Read区域的新闻列表。
 
-        使用Playwright模拟浏览器访问BBC新闻首页，解析HTML获取热门新闻数据。
-
         Returns:
             List[Dict]: 新闻列表，每条包含title_en(英文标题)、url(链接)、crawled_at(爬取时间)。
         """
-        articles: List[Dict] = []
+        return await self.fetch_all([{"type": "most_read", "url": self.URL}])
 
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
-
-            await page.goto(
-                self.URL,
-                wait_until="domcontentloaded",
-                timeout=60000
-            )
-
-            await page.wait_for_timeout(5000)
-
-            most_read_section = None
-            selectors = [
-                'section[data-testid="illinois-section-outer-10"]',
-                'section[data-analytics_group_name="Most read"]',
-                '[data-analytics_group_name="Most read"]',
-            ]
-
-            for selector in selectors:
-                section = await page.query_selector(selector)
-                if section:
-                    most_read_section = section
-                    print(f"找到 Most Read 区域: {selector}")
-                    break
-
-            if not most_read_section:
-                print("未找到 Most Read 区域")
-                await browser.close()
+    async def fetch_all(self, sources: Optional[List[Dict]] = None) -> List[Dict]:
+        """并发获取所有来源的新闻列表，并按规范化后的链接去重。
+
+        栏目页共用同一个浏览器实例，每个来源使用独立页面；RSS订阅源不启动浏览器。
+
+        Args:
+            sources: 爬取来源列表，默认为初始化时指定的来源。
+
+        Returns:
+            List[Dict]: 去重后的新闻列表，每条包含title_en、url、crawled_at，RSS来源可能包含published_at。
+        """
+        sources = sources or self.sources
+        semaphore = asyncio.Semaphore(CRAWLER_CONFIG["concurrency"])
+        page_sources = [s for s in sources if s["type"] in ("most_read", "section")]
+        feed_sources = [s for s in sources if s["type"] == "rss"]
+
+        async def _feed(source: Dict) -> List[Dict]:
+            async with semaphore:
+                with span("crawler.feed", url=source["url"]):
+                    return await self._fetch_feed(source["url"])
+
+        async def _page(browser, source: Dict) -> List[Dict]:
+            async with semaphore, browser_limiter.async_slot():
+                return await self._fetch_page(browser, source)
+
+        async def _pages() -> List:
+            """启动共享浏览器获取所有页面来源；导入或启动失败时每个页面来源都记为该异常。"""
+            if not page_sources:
                 return []
+            try:
+                # Playwright导入较慢，只在确实需要浏览器时加载
+                from playwright.async_api import async_playwright
+
+                async with async_playwright() as p:
+                    with BROWSER_SECONDS.time(component="crawler", stage="launch"), span("crawler.launch"):
+                        browser = await p.chromium.launch(headless=True)
+                    try:
+                        return await asyncio.gather(
+                            *[_page(browser, s) for s in page_sources], return_exceptions=True
+                        )
+                    finally:
+                        await browser.close()
+            except Exception as e:
+                return [e] * len(page_sources)
 
-            article_links = await most_read_section.query_selector_all('a')
+        # 订阅源不依赖浏览器，与页面来源分别收集，浏览器启动失败不影响订阅源的结果
+        feed_results, page_results = await asyncio.gather(
+            asyncio.gather(*[_feed(s) for s in feed_sources], return_exceptions=True),
+            _pages(),
+        )
+        results = list(feed_results) + list(page_results)
 
-            for link in article_links:
-                href = await link.get_attribute("href")
-                if not href or "/news/" not in href:
+        articles: List[Dict] = []
+        seen = set()
+        for source, result in zip(feed_sources + page_sources, results):
+            if isinstance(result, Exception):
+                print(f"爬取来源失败 {source['url']}: {result}")
+                continue
+            for article in result:
+                if article["url"] in seen:
                     continue
+                seen.add(article["url"])
+                articles.append(article)
 
-                full_url = "https://www.bbc.com" + href if href.startswith("/") else href
+        return articles
 
-                h2_elem = await link.query_selector("h2")
-                title = await h2_elem.inner_text() if h2_elem else ""
+    async def _fetch_page(self, browser, source: Dict) -> List[Dict]:
+        """使用浏览器页面获取首页Most Read区域或栏目页的新闻链接。
 
-                if title and full_url:
-                    articles.append({
-                        "title_en": title,
-                        "url": full_url,
-                        "crawled_at": datetime.now().isoformat()
-                    })
+        Args:
+            browser: 共享的Playwright浏览器实例。
+            source: 来源配置，type为most_read或section。
+
+        Returns:
+            List[Dict]: 该来源中的新闻列表。
+        """
+        page = await browser.new_page()
+        try:
+            with BROWSER_SECONDS.time(component="crawler", stage="navigate"), span("crawler.navigate"):
+                await page.goto(
+                    source["url"],
+                    wait_until="domcontentloaded",
+                    timeout=60000
+                )
+            with BROWSER_SECONDS.time(component="crawler", stage="wait"), span("crawler.wait"):
+                await page.wait_for_timeout(5000)
 
-            await browser.close()
+            if source["type"] == "most_read":
+                container = None
+                for selector in self.MOST_READ_SELECTORS:
+                    section = await page.query_selector(selector)
+                    if section:
+                        container = section
+                        print(f"找到 Most Read 区域: {selector}")
+                        break
+
+                if not container:
+                    print("未找到 Most Read 区域")
+                    return []
+            else:
+                container = await page.query_selector("main") or page
+
+            with BROWSER_SECONDS.time(component="crawler", stage="extract"), span("crawler.extract"):
+                return await self._extract_links(container)
+        finally:
+            await page.close()
+
+    async def _extract_links(self, container) -> List[Dict]:
+        """从页面区域中提取带标题的新闻链接。
+
+        Args:
+            container: Playwright页面或元素。
+
+        Returns:
+            List[Dict]: 新闻列表。
+        """
+        articles: List[Dict] = []
+
+        for link in await container.query_selector_all('a'):
+            href = await link.get_attribute("href")
+            if not href or "/news/" not in href:
+                continue
+
+            h2_elem = await link.query_selector("h2")
+            title = await h2_elem.inner_text() if h2_elem else ""
+
+            if title:
+                articles.append({
+                    "title_en": title,
+                    "url": normalize_url(href),
+                    "crawled_at": datetime.now().isoformat()
+                })
 
         return articles
 
+    async def _fetch_feed(self, url: str) -> List[Dict]:
+        """获取并解析RSS/Atom订阅源。
+
+        Args:
+            url: 订阅源链接。
+
+        Returns:
+            List[Dict]: 订阅源中的新闻列表。
+        """
+        import requests
+
+        response = await asyncio.to_thread(
+            requests.get,
+            url,
+            headers=CRAWLER_CONFIG["headers"],
+            timeout=CRAWLER_CONFIG["timeout"],
+        )
+        response.raise_for_status()
+        return parse_feed(response.content)
+
+
+def parse_feed(data: bytes) -> List[Dict]:
+    """使用流式XML解析RSS 2.0或Atom订阅源。
+
+    逐个处理item/entry元素并及时释放，避免为大型订阅源构建完整的DOM树。
+
+    Args:
+        data: 订阅源的原始XML内容。
+
+    Returns:
+        List[Dict]: 新闻列表，每条包含title_en、url、published_at、crawled_at。
+    """
+    articles: List[Dict] = []
+    crawled_at = datetime.now().isoformat()
+
+    for _, elem in ET.iterparse(io.BytesIO(data), events=("end",)):
+        tag = elem.tag.rsplit("}", 1)[-1]
+        if tag not in ("item", "entry"):
+            continue
+
+        title = ""
+        link = ""
+        published_at = ""
+        for child in elem:
+            name = child.tag.rsplit("}", 1)[-1]
+            if name == "title":
+                title = (child.text or "").strip()
+            elif name == "link":
+                # RSS的链接在文本中，Atom的链接在href属性中；
+                # Atom条目可能有多个link，只取文章页面（rel为alternate或未指定），忽略enclosure、self等
+                if child.get("rel", "alternate") == "alternate" and not link:
+                    link = (child.get("href") or child.text or "").strip()
+            elif name in ("pubDate", "published", "updated") and not published_at:
+                published_at = (child.text or "").strip()
+
+        if title and link and "/news/" in link:
+            articles.append({
+                "title_en": title,
+                "url": normalize_url(link),
+                "published_at": published_at,
+                "crawled_at": crawled_at,
+            })
+        elem.clear()
+
+    return articles
+
 
 async def run() -> List[Dict]:
-    """运行爬虫，返回爬取的新闻列表。"""
+    """运行爬虫，返回所有来源爬取的新闻列表。"""
     crawler = BBCCrawler()
-    articles = await crawler.fetch_most_read()
+    articles = await crawler.fetch_all()
     print(f"获取到 {len(articles)} 条新闻")
     return articles
 
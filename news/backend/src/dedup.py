@@ -0,0 +1,125 @@
+"""近似重复检测模块。
+
+基于SimHash为文章正文计算指纹，用于发现BBC以不同链接发布的更新版或平行版报道，
+并按段落复用已有译文，只翻译新增或改动的段落。
+只负责计算，不涉及数据库操作。
+"""
+import hashlib
+import re
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from config.config import DEDUP_CONFIG
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def split_paragraphs(text: str) -> List[str]:
+    """按空行切分段落，去除首尾空白和空段落。
+
+    Args:
+        text: 文章正文。
+
+    Returns:
+        List[str]: 段落列表。
+    """
+    if not text:
+        return []
+    return [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+
+
+def simhash(text: str) -> int:
+    """计算文本的64位SimHash指纹。
+
+    以小写单词的连续shingle作为特征，相似文本的指纹汉明距离较小。
+
+    Args:
+        text: 待计算的文本。
+
+    Returns:
+        int: 64位有符号整数指纹，可直接存入SQLite的INTEGER字段。
+    """
+    words = _WORD_RE.findall(text.lower())
+    size = DEDUP_CONFIG["shingle_size"]
+    if len(words) < size:
+        shingles = [" ".join(words)] if words else []
+    else:
+        shingles = [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+    weights = [0] * 64
+    for shingle in shingles:
+        h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if h >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit in range(64):
+        if weights[bit] > 0:
+            fingerprint |= 1 << bit
+
+    # 转为有符号64位整数，SQLite的INTEGER最大为2^63-1
+    return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+
+def content_hash(text: str) -> str:
+    """计算正文的内容哈希，用于判断文章是否有更新。
+
+    忽略段落间空白差异，避免排版变化被误判为内容更新。
+
+    Args:
+        text: 文章正文。
+
+    Returns:
+        str: SHA-256十六进制摘要。
+    """
+    normalized = "\n\n".join(split_paragraphs(text))
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """计算两个64位指纹的汉明距离。"""
+    return bin((a ^ b) & 0xFFFFFFFFFFFFFFFF).count("1")
+
+
+def translate_with_reuse(
+    content_en: str,
+    references: Iterable[Tuple[str, str]],
+    translate: Callable[[str], str],
+) -> Tuple[str, int]:
+    """复用已有译文翻译正文，只翻译参考文章中不存在的段落。
+
+    参考文章的英文和中文段落数一致时才认为译文按段落对齐，可以逐段复用。
+    没有任何段落可复用时，退化为整篇翻译。
+
+    Args:
+        content_en: 待翻译的英文正文。
+        references: 参考文章的(英文正文, 中文正文)列表。
+        translate: 翻译函数，输入英文返回中文，失败时返回空字符串。
+
+    Returns:
+        Tuple[str, int]: 中文正文和复用的段落数；任一缺失段落翻译失败时中文正文为空字符串，
+            调用方不应保存。
+    """
+    paragraphs = split_paragraphs(content_en)
+    memory: Dict[str, str] = {}
+    for ref_en, ref_zh in references:
+        en_parts = split_paragraphs(ref_en)
+        zh_parts = split_paragraphs(ref_zh)
+        if en_parts and len(en_parts) == len(zh_parts):
+            memory.update(zip(en_parts, zh_parts))
+
+    missing = [p for p in dict.fromkeys(paragraphs) if p not in memory]
+    reused = sum(1 for p in paragraphs if p in memory)
+    if reused == 0:
+        return translate(content_en), 0
+
+    if missing:
+        # 先合并成一次调用翻译，段落数对不上时再逐段翻译
+        translated = split_paragraphs(translate("\n\n".join(missing)))
+        if len(translated) != len(missing):
+            translated = [translate(p) for p in missing]
+        # 不能只拼接复用的段落，否则会把缺段的译文当作完整译文保存
+        if len(translated) != len(missing) or not all(translated):
+            return "", reused
+        memory.update(zip(missing, translated))
+
+    return "\n\n".join(memory[p] for p in paragraphs), reused
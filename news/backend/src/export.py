@@ -0,0 +1,72 @@
+"""文章导出导入模块。
+
+以NDJSON（每行一个JSON对象）格式流式导出和读取文章，可选gzip压缩，
+全程按行处理，内存占用与数据量无关。
+"""
+import gzip
+import json
+import zlib
+from typing import Iterable, Iterator, Optional, Tuple
+
+from config.config import EXPORT_CONFIG
+
+# 每累积到该字节数输出一次，避免逐行产生过多小分片
+_FLUSH_BYTES = 64 * 1024
+
+
+def encode_ndjson(articles: Iterable[dict], compress: bool = False) -> Iterator[bytes]:
+    """将文章序列编码为NDJSON字节流。
+
+    Args:
+        articles: 文章记录，通常来自db.iter_articles。
+        compress: 是否输出gzip格式。
+
+    Yields:
+        bytes: 输出分片，依次拼接即为完整文件。
+    """
+    # wbits=31表示带gzip文件头，可直接用gzip.open读取
+    compressor = zlib.compressobj(EXPORT_CONFIG["gzip_level"], zlib.DEFLATED, 31) if compress else None
+    buffer = bytearray()
+    for article in articles:
+        buffer += json.dumps(article, ensure_ascii=False).encode("utf-8")
+        buffer += b"\n"
+        if len(buffer) >= _FLUSH_BYTES:
+            chunk = compressor.compress(bytes(buffer)) if compressor else bytes(buffer)
+            buffer.clear()
+            if chunk:
+                yield chunk
+
+    tail = bytes(buffer)
+    if compressor:
+        tail = compressor.compress(tail) + compressor.flush()
+    if tail:
+        yield tail
+
+
+def read_ndjson(path: str) -> Iterator[Tuple[int, Optional[dict]]]:
+    """逐行读取NDJSON文件，.gz结尾的文件按gzip解压。
+
+    Args:
+        path: 文件路径。
+
+    Yields:
+        Tuple[int, Optional[dict]]: (文件行号, 文章记录)，空行会被跳过；
+            无法解析为JSON对象的行打印原因后记录为None，由调用方计入无效记录。
+    """
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"第 {line_number} 行解析失败，已跳过: {e}")
+                yield line_number, None
+                continue
+            if not isinstance(record, dict):
+                print(f"第 {line_number} 行不是JSON对象，已跳过")
+                yield line_number, None
+                continue
+            yield line_number, record
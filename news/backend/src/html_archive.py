@@ -0,0 +1,88 @@
+"""原始HTML归档模块。
+
+按内容寻址（SHA-256）压缩保存抓取到的页面HTML，支持离线重新解析。
+优先使用zstd压缩，未安装zstandard时退化为zlib。
+"""
+import hashlib
+import os
+import zlib
+from pathlib import Path
+from typing import Optional
+
+from config.config import ARCHIVE_CONFIG
+from src.metrics import CACHE_EVENTS_TOTAL
+
+try:
+    import zstandard
+except ImportError:  # zstandard为可选依赖
+    zstandard = None
+
+
+class HtmlArchive:
+    """HTML归档存储，同一内容只保存一份。"""
+
+    def __init__(self, root: Optional[Path] = None):
+        """初始化归档目录。
+
+        Args:
+            root: 归档根目录，默认为config中配置的路径。
+        """
+        self.root = Path(root or ARCHIVE_CONFIG["path"])
+        self.use_zstd = ARCHIVE_CONFIG["compression"] == "zstd" and zstandard is not None
+
+    def _path(self, key: str, suffix: str) -> Path:
+        """返回归档文件路径，按摘要前两位分目录避免单目录文件过多。"""
+        return self.root / key[:2] / f"{key}{suffix}"
+
+    def put(self, html: str) -> str:
+        """压缩保存HTML。
+
+        Args:
+            html: 页面HTML。
+
+        Returns:
+            str: 内容的SHA-256摘要，作为读取时的键。
+        """
+        data = html.encode("utf-8")
+        key = hashlib.sha256(data).hexdigest()
+
+        for suffix in (".zst", ".zz"):
+            if self._path(key, suffix).exists():
+                CACHE_EVENTS_TOTAL.inc(cache="html_archive", result="hit")
+                return key
+        CACHE_EVENTS_TOTAL.inc(cache="html_archive", result="miss")
+
+        if self.use_zstd:
+            path = self._path(key, ".zst")
+            blob = zstandard.ZstdCompressor(level=ARCHIVE_CONFIG["level"]).compress(data)
+        else:
+            path = self._path(key, ".zz")
+            blob = zlib.compress(data, min(ARCHIVE_CONFIG["level"], 9))
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # 先写临时文件再重命名，避免并发写入或中断留下不完整的归档
+        tmp = path.with_suffix(f"{path.suffix}.{os.getpid()}.tmp")
+        tmp.write_bytes(blob)
+        os.replace(tmp, path)
+        return key
+
+    def get(self, key: str) -> Optional[str]:
+        """读取归档的HTML。
+
+        Args:
+            key: put返回的摘要。
+
+        Returns:
+            Optional[str]: 页面HTML，不存在返回None。
+        """
+        path = self._path(key, ".zst")
+        if path.exists():
+            if zstandard is None:
+                raise RuntimeError("读取zstd归档需要安装zstandard")
+            data = zstandard.ZstdDecompressor().decompress(path.read_bytes())
+            return data.decode("utf-8")
+
+        path = self._path(key, ".zz")
+        if path.exists():
+            return zlib.decompress(path.read_bytes()).decode("utf-8")
+        return None
@@ -0,0 +1,234 @@
+"""图片缓存模块。
+
+按图片URL下载一次原图保存到本地磁盘，并生成缩略图、详情图等缩放后的版本，
+由/api/images接口提供给前端，避免直接引用BBC CDN的原尺寸图片。
+缓存目录总大小有上限，超过后按最近访问时间淘汰。
+缩放依赖可选的Pillow，未安装时各版本直接返回原图。
+下载或处理失败的图片会短时间记住失败，期间的请求直接返回失败，不再阻塞等待上游。
+"""
+import functools
+import hashlib
+import io
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from config.config import CRAWLER_CONFIG, IMAGE_CONFIG
+from src.metrics import CACHE_EVENTS_TOTAL
+from src.singleflight import SingleFlight
+
+_EXTENSIONS = {"webp": (".webp", "image/webp"), "jpeg": (".jpg", "image/jpeg")}
+
+
+class ImageUnavailable(Exception):
+    """图片最近获取失败，在IMAGE_CONFIG["failure_ttl"]内不再重试。"""
+
+
+@functools.lru_cache(maxsize=None)
+def _output_format() -> Optional[str]:
+    """返回实际使用的输出格式：Pillow不支持webp时退化为jpeg，未安装Pillow时返回None。
+
+    Pillow在首次处理图片时才导入，不影响进程启动速度。
+    """
+    try:
+        from PIL import features
+    except ImportError:  # Pillow为可选依赖
+        return None
+    if IMAGE_CONFIG["format"] == "webp" and features.check("webp"):
+        return "webp"
+    return "jpeg"
+
+
+class ImageCache:
+    """图片磁盘缓存，同一URL只下载一次。"""
+
+    def __init__(self, root: Optional[Path] = None):
+        """初始化缓存目录。
+
+        Args:
+            root: 缓存根目录，默认为config中配置的路径。
+        """
+        self.root = Path(root or IMAGE_CONFIG["path"])
+        self._inflight = SingleFlight()
+        self._lock = threading.Lock()
+        # 缓存目录当前总大小，首次写入时扫描目录得到
+        self._size: Optional[int] = None
+        # 最近失败的图片：URL摘要 -> (失败记录过期时间, 失败原因)
+        self._failures: Dict[str, Tuple[float, str]] = {}
+
+    def _path(self, key: str, name: str) -> Path:
+        """返回缓存文件路径，按摘要前两位分目录避免单目录文件过多。"""
+        return self.root / key[:2] / f"{key}.{name}"
+
+    def get(self, url: str, variant: str) -> Tuple[Path, str, str]:
+        """返回图片某个尺寸版本的本地文件，不存在时下载并生成。
+
+        Args:
+            url: 图片原始链接。
+            variant: 尺寸名称，取值为IMAGE_CONFIG["variants"]的键。
+
+        Returns:
+            Tuple[Path, str, str]: (文件路径, MIME类型, ETag)。
+
+        Raises:
+            KeyError: 未配置的尺寸。
+            ImageUnavailable: 该图片最近获取失败，尚未到重试时间。
+            requests.RequestException: 原图下载失败。
+        """
+        width = IMAGE_CONFIG["variants"][variant]
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+        output_format = _output_format()
+        if output_format is None:
+            path, mimetype = self._path(key, "orig"), None
+        else:
+            extension, mimetype = _EXTENSIONS[output_format]
+            path = self._path(key, f"{variant}{extension}")
+        # 同一URL的图片内容不变，ETag只需区分URL、尺寸和输出格式
+        etag = f"{key[:24]}-{variant}-{width}-{output_format or 'orig'}"
+
+        if path.exists():
+            CACHE_EVENTS_TOTAL.inc(cache="image", result="hit")
+            self._touch(path)
+        else:
+            self._check_failure(key)
+            CACHE_EVENTS_TOTAL.inc(cache="image", result="miss")
+            try:
+                self._inflight.do((key, variant), lambda: self._build(url, key, variant, width, path))
+            except Exception as e:
+                with self._lock:
+                    self._failures[key] = (time.monotonic() + IMAGE_CONFIG["failure_ttl"], str(e))
+                raise
+        if mimetype is None:
+            mimetype = self._sniff(path)
+        return path, mimetype, etag
+
+    def _check_failure(self, key: str) -> None:
+        """图片在失败记录有效期内时抛出ImageUnavailable，过期的记录顺便删除。"""
+        with self._lock:
+            failure = self._failures.get(key)
+            if failure is None:
+                return
+            expires_at, reason = failure
+            if time.monotonic() >= expires_at:
+                del self._failures[key]
+                return
+        CACHE_EVENTS_TOTAL.inc(cache="image", result="failed")
+        raise ImageUnavailable(f"图片最近获取失败，{expires_at - time.monotonic():.0f}秒后重试: {reason}")
+
+    def warm(self, url: str) -> None:
+        """预先下载原图并生成所有尺寸版本。"""
+        for variant in IMAGE_CONFIG["variants"]:
+            self.get(url, variant)
+
+    def _build(self, url: str, key: str, variant: str, width: int, path: Path) -> None:
+        """下载原图（如未缓存）并生成指定尺寸。"""
+        if path.exists():
+            return
+        original_path = self._path(key, "orig")
+        original = self._inflight.do((key, "orig"), lambda: self._load_original(url, original_path))[0]
+        output_format = _output_format()
+        if output_format is None:
+            return
+
+        from PIL import Image
+
+        with Image.open(io.BytesIO(original)) as image:
+            image.thumbnail((width, width * 4))
+            if image.mode not in ("RGB", "RGBA") or output_format == "jpeg":
+                image = image.convert("RGB")
+            output = io.BytesIO()
+            image.save(output, format=output_format.upper(), quality=IMAGE_CONFIG["quality"])
+        self._write(path, output.getvalue())
+
+    def _load_original(self, url: str, path: Path) -> bytes:
+        """读取已缓存的原图，不存在时下载。"""
+        if path.exists():
+            self._touch(path)
+            return path.read_bytes()
+
+        import requests
+
+        response = requests.get(
+            url,
+            headers=CRAWLER_CONFIG["headers"],
+            timeout=IMAGE_CONFIG["timeout"],
+            stream=True,
+        )
+        response.raise_for_status()
+        data = bytearray()
+        for chunk in response.iter_content(64 * 1024):
+            data += chunk
+            if len(data) > IMAGE_CONFIG["max_download_bytes"]:
+                response.close()
+                raise ValueError(f"图片超过 {IMAGE_CONFIG['max_download_bytes']} 字节: {url}")
+        self._write(path, bytes(data))
+        return bytes(data)
+
+    def _write(self, path: Path, data: bytes) -> None:
+        """原子写入缓存文件，并在超过容量上限时淘汰旧文件。"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # 先写临时文件再重命名，避免并发写入或中断留下不完整的文件
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+        with self._lock:
+            if self._size is None:
+                self._size = sum(f.stat().st_size for f in self._files())
+            else:
+                self._size += len(data)
+            if self._size > IMAGE_CONFIG["max_bytes"]:
+                self._evict(keep=path)
+
+    def _evict(self, keep: Path) -> None:
+        """按最近访问时间删除旧文件，直到总大小降到上限的90%（需持有_lock）。"""
+        target = IMAGE_CONFIG["max_bytes"] * 0.9
+        entries = sorted(
+            ((f.stat().st_mtime, f.stat().st_size, f) for f in self._files() if f != keep),
+            key=lambda e: e[0],
+        )
+        for _, size, f in entries:
+            if self._size <= target:
+                break
+            try:
+                f.unlink()
+                self._size -= size
+            except FileNotFoundError:
+                pass
+
+    def _files(self):
+        """遍历缓存目录中的文件（不含临时文件）。"""
+        if not self.root.exists():
+            return
+        for f in self.root.glob("*/*"):
+            if f.is_file() and not f.name.endswith(".tmp"):
+                yield f
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        """更新修改时间作为最近访问时间，供淘汰时排序。"""
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _sniff(path: Path) -> str:
+        """根据文件头判断原图的MIME类型。"""
+        with open(path, "rb") as f:
+            head = f.read(12)
+        if head.startswith(b"\xff\xd8"):
+            return "image/jpeg"
+        if head.startswith(b"\x89PNG"):
+            return "image/png"
+        if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+            return "image/webp"
+        if head[:6] in (b"GIF87a", b"GIF89a"):
+            return "image/gif"
+        return "application/octet-stream"
+
+
+image_cache = ImageCache()
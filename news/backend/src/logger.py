@@ -0,0 +1,44 @@
+"""日志模块。
+
+根据LOG_CONFIG统一配置项目日志，同时输出到控制台和日志文件。
+"""
+import logging
+import threading
+
+from config.config import LOG_CONFIG
+
+_configured = False
+_lock = threading.Lock()
+
+
+def get_logger(name: str) -> logging.Logger:
+    """获取项目日志记录器，首次调用时按LOG_CONFIG完成配置。
+
+    Args:
+        name: 日志记录器名称，会挂在news命名空间下。
+
+    Returns:
+        logging.Logger: 日志记录器。
+    """
+    global _configured
+    with _lock:
+        if not _configured:
+            root = logging.getLogger("news")
+            root.setLevel(LOG_CONFIG["level"])
+            formatter = logging.Formatter(LOG_CONFIG["format"])
+
+            console = logging.StreamHandler()
+            console.setFormatter(formatter)
+            root.addHandler(console)
+
+            try:
+                LOG_CONFIG["file"].parent.mkdir(parents=True, exist_ok=True)
+                file_handler = logging.FileHandler(LOG_CONFIG["file"], encoding="utf-8")
+                file_handler.setFormatter(formatter)
+                root.addHandler(file_handler)
+            except OSError as e:
+                root.warning(f"无法写入日志文件 {LOG_CONFIG['file']}: {e}")
+
+            root.propagate = False
+            _configured = True
+    return logging.getLogger(f"news.{name}")
@@ -0,0 +1,183 @@
+"""运行指标模块。
+
+提供线程安全的Counter、Gauge、Histogram，并按Prometheus文本格式导出，
+由API的 /metrics 接口暴露。不依赖prometheus_client。
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# 默认延迟分桶（秒），覆盖毫秒级SQLite查询到分钟级LLM调用
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+def _escape(value) -> str:
+    """转义标签值中的反斜杠、换行和双引号。"""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    """指标基类，按标签值分组保存数据。"""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: Dict) -> Tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _format_labels(self, key: Tuple, extra: Optional[Dict] = None) -> str:
+        pairs = list(zip(self.labelnames, key)) + list((extra or {}).items())
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+
+class Counter(_Metric):
+    """只增不减的计数器。"""
+
+    type_name = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in self._values.items():
+                lines.append(f"{self.name}{self._format_labels(key)} {value}")
+        return lines
+
+
+class Gauge(_Metric):
+    """可增可减的瞬时值，如队列深度。"""
+
+    type_name = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple, float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in self._values.items():
+                lines.append(f"{self.name}{self._format_labels(key)} {value}")
+        return lines
+
+
+class Histogram(_Metric):
+    """累积分桶直方图，用于记录延迟分布。"""
+
+    type_name = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # 每组标签：[各分桶计数..., 总和, 总数]
+        self._values: Dict[Tuple, List[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            data = self._values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    data[i] += 1
+            data[-2] += value
+            data[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """记录代码块耗时（秒），异常时同样记录。"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, data in self._values.items():
+                for bound, count in zip(self.buckets, data):
+                    lines.append(f"{self.name}_bucket{self._format_labels(key, {'le': bound})} {count}")
+                lines.append(f"{self.name}_bucket{self._format_labels(key, {'le': '+Inf'})} {data[-1]}")
+                lines.append(f"{self.name}_sum{self._format_labels(key)} {data[-2]}")
+                lines.append(f"{self.name}_count{self._format_labels(key)} {data[-1]}")
+        return lines
+
+
+REGISTRY: List[_Metric] = []
+
+
+def render_metrics() -> str:
+    """按Prometheus文本格式（0.0.4）导出所有指标。"""
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ---- 各模块共用的指标 ----
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "news_http_request_seconds", "HTTP接口耗时", ["method", "route", "status"]
+)
+BROWSER_SECONDS = Histogram(
+    "news_browser_seconds", "Playwright各阶段耗时", ["component", "stage"]
+)
+LLM_REQUEST_SECONDS = Histogram(
+    "news_llm_request_seconds", "大模型调用总耗时", ["model", "task"]
+)
+LLM_TTFT_SECONDS = Histogram(
+    "news_llm_ttft_seconds", "大模型首个token延迟", ["model", "task"]
+)
+LLM_TOKENS_TOTAL = Counter(
+    "news_llm_tokens_total", "大模型消耗的token数（来自usage）", ["model", "direction"]
+)
+LLM_ERRORS_TOTAL = Counter(
+    "news_llm_errors_total", "大模型调用失败次数", ["model", "task"]
+)
+LLM_ROUTE_TOTAL = Counter(
+    "news_llm_route_total", "模型路由选择次数", ["model", "task"]
+)
+DB_QUERY_SECONDS = Histogram(
+    "news_db_query_seconds", "Database方法耗时", ["method"]
+)
+CACHE_EVENTS_TOTAL = Counter(
+    "news_cache_events_total", "缓存命中/未命中次数", ["cache", "result"]
+)
+SCHEDULER_WAIT_SECONDS = Histogram(
+    "news_scheduler_wait_seconds", "共享资源按通道排队等待时间", ["resource", "lane"]
+)
+QUEUE_DEPTH = Gauge(
+    "news_queue_depth", "队列中等待或执行中的任务数", ["queue", "state"]
+)
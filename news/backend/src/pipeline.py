@@ -4,19 +4,48 @@
 支持单独调用或组合调用各个功能模块。
 """
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 
+from config.config import ARCHIVE_CONFIG, DEDUP_CONFIG, EXPORT_CONFIG, IMAGE_CONFIG, REFRESH_CONFIG
 from models.database import db
 
 from src.crawler import BBCCrawler, run as run_crawler
-from src.article_fetcher import ArticleFetcher, fetch_article
+from src.article_fetcher import ArticleFetcher, extract_article, fetch_article
 from src.ai.translator import Translator
+from src.ai.polisher import Polisher
+from src.dedup import content_hash, simhash, translate_with_reuse
+from src.export import encode_ndjson, read_ndjson
+from src.html_archive import HtmlArchive
+from src.image_cache import image_cache
+from src.metrics import CACHE_EVENTS_TOTAL
+from src.scheduler import INTERACTIVE, current_lane
+from src.singleflight import coalesced, digest
+from src.tracing import span, traced
+
+
+def _reextract_archived(html_sha: str) -> Optional[Dict]:
+    """在子进程中读取归档HTML并重新解析（需为模块级函数以便跨进程调用）。"""
+    html = HtmlArchive().get(html_sha)
+    if html is None:
+        return None
+    result = extract_article(html)
+    result["content_hash"] = content_hash(result["content_en"])
+    return result
+
+
+# API请求中预热图片使用的后台线程
+_image_warmer = ThreadPoolExecutor(
+    max_workers=IMAGE_CONFIG["prewarm_workers"], thread_name_prefix="image-warm"
+)
 
 
 class NewsPipeline:
     """新闻处理流水线，整合爬虫、获取、翻译等各个环节。"""
 
     @staticmethod
+    @traced("pipeline.crawl_and_save")
     async def crawl_and_save() -> int:
         """步骤1: 爬取新闻列表并保存到数据库。
 
@@ -24,7 +53,7 @@ class NewsPipeline:
             int: 新增文章数量。
         """
         print("=" * 50)
-        print("步骤1: 爬取BBC Most Read新闻")
+        print("步骤1: 爬取BBC新闻（栏目页及RSS订阅源）")
         print("=" * 50)
 
         articles = await run_crawler()
@@ -60,10 +89,182 @@ class NewsPipeline:
             print("获取内容失败")
             return False
 
-        db.update_article(article_id, result)
+        NewsPipeline.save_content(article_id, result)
+        NewsPipeline.warm_image(result.get("image_url"))
         print("文章内容已更新")
         return True
 
+    @staticmethod
+    @traced("pipeline.fetch_and_save")
+    @coalesced("fetch", lambda article: (article["id"], digest(article["url"])))
+    def fetch_and_save(article: Dict) -> bool:
+        """获取文章内容并保存。
+
+        Args:
+            article: 文章数据，需包含id和url。
+
+        Returns:
+            bool: 成功返回True，失败返回False。
+        """
+        result = asyncio.run(ArticleFetcher().fetch_content(article["url"]))
+        if not result:
+            return False
+        NewsPipeline.save_content(article["id"], result)
+        NewsPipeline.warm_image(result.get("image_url"))
+        return True
+
+    @staticmethod
+    def warm_image(image_url: Optional[str]) -> None:
+        """预先下载文章配图并生成各尺寸版本，失败不影响流水线。
+
+        interactive通道（API请求）中提交到后台线程执行，不延迟响应；
+        命令行和批量任务中直接执行。
+
+        Args:
+            image_url: 图片链接，为空时跳过。
+        """
+        if not image_url or not IMAGE_CONFIG["prewarm"]:
+            return
+        if current_lane() == INTERACTIVE:
+            _image_warmer.submit(NewsPipeline._warm_image, image_url)
+        else:
+            NewsPipeline._warm_image(image_url)
+
+    @staticmethod
+    @traced("pipeline.warm_image")
+    def _warm_image(image_url: str) -> None:
+        """下载图片并生成各尺寸版本，捕获所有异常。"""
+        try:
+            image_cache.warm(image_url)
+        except Exception as e:
+            print(f"预热图片缓存失败: {e}")
+
+    @staticmethod
+    @traced("pipeline.fetch_and_translate")
+    @coalesced("fetch-and-translate", lambda article: (
+        article["id"], digest(article["url"], article.get("content_en"))
+    ))
+    def fetch_and_translate(article: Dict) -> bool:
+        """获取原文（已获取则跳过）并翻译。
+
+        Args:
+            article: 文章数据。
+
+        Returns:
+            bool: 成功返回True；获取失败、翻译失败或原文已变化时返回False。
+        """
+        if not article.get("content_en"):
+            if not NewsPipeline.fetch_and_save(article):
+                return False
+            article = db.get_article_by_id(article["id"])
+        return NewsPipeline.translate_and_save(article)
+
+    @staticmethod
+    @traced("pipeline.polish_and_save")
+    @coalesced("polish", lambda article: (article["id"], digest(article.get("content_zh"))))
+    def polish_and_save(article: Dict) -> bool:
+        """AI润色文章中文正文并保存。
+
+        Args:
+            article: 文章数据，需包含content_zh。
+
+        Returns:
+            bool: 成功返回True，未翻译或润色失败返回False。
+        """
+        if not article.get("content_zh"):
+            return False
+
+        content_polished = Polisher().polish(article["content_zh"])
+        if not content_polished:
+            return False
+
+        # 只有译文未被改动时才写入，避免基于旧译文的润色结果覆盖新数据
+        if not db.update_article(article["id"], {
+            "content_polished": content_polished,
+            "polished_at": datetime.now().isoformat(),
+            "status": "polished"
+        }, expected={"content_zh": article["content_zh"]}):
+            print(f"文章 {article['id']} 的译文已变化，放弃保存润色结果")
+            return False
+        return True
+
+    @staticmethod
+    @traced("pipeline.save_content")
+    def save_content(article_id: int, result: Dict) -> None:
+        """保存获取到的文章内容，并更新正文指纹。
+
+        Args:
+            article_id: 文章ID。
+            result: ArticleFetcher返回的内容字典。
+        """
+        if result.get("content_en"):
+            result = dict(result, content_hash=content_hash(result["content_en"]))
+        db.update_article(article_id, result)
+        if result.get("content_en"):
+            db.save_fingerprint(article_id, simhash(result["content_en"]))
+
+    @staticmethod
+    @traced("pipeline.translate_and_save")
+    @coalesced("translate", lambda article, translator=None: (
+        article["id"], digest(article["title_en"], article.get("content_en"))
+    ))
+    def translate_and_save(article: Dict, translator: Optional[Translator] = None) -> bool:
+        """翻译文章标题和正文并保存。
+
+        如果存在已翻译的近似重复文章，按段落复用其译文，只翻译不同的段落。
+
+        Args:
+            article: 文章数据，需包含id、title_en和content_en。
+            translator: 可选，复用已有的翻译器实例。
+
+        Returns:
+            bool: 保存成功返回True，正文翻译失败或原文已变化时返回False。
+        """
+        translator = translator or Translator()
+        content_en = article.get("content_en") or ""
+
+        duplicates = []
+        if content_en:
+            fingerprint = article.get("simhash")
+            if fingerprint is None:
+                fingerprint = simhash(content_en)
+                db.save_fingerprint(article["id"], fingerprint)
+            duplicates = db.find_near_duplicates(
+                fingerprint, DEDUP_CONFIG["max_distance"], exclude_id=article["id"]
+            )
+
+        title_zh = next(
+            (d["title_zh"] for d in duplicates if d["title_en"] == article["title_en"] and d.get("title_zh")),
+            None
+        ) or translator.translate(article["title_en"], task="title")
+        print(f"标题翻译完成: {title_zh[:30]}...")
+
+        content_zh = ""
+        if content_en:
+            content_zh, reused = translate_with_reuse(
+                content_en,
+                [(d["content_en"], d["content_zh"]) for d in duplicates],
+                translator.translate,
+            )
+            CACHE_EVENTS_TOTAL.inc(cache="translation_reuse", result="hit" if reused else "miss")
+            if not content_zh:
+                print(f"文章 {article['id']} 的正文翻译失败，不保存译文")
+                return False
+            if reused:
+                print(f"复用近似重复文章 {duplicates[0]['id']} 的译文: {reused} 段")
+            print(f"正文翻译完成: {len(content_zh)} 字符")
+
+        # 只有原文未被改动时才写入，避免基于旧原文的译文覆盖新数据
+        if not db.update_article(article["id"], {
+            "title_zh": title_zh,
+            "content_zh": content_zh,
+            "status": "translated",
+            "translated_at": datetime.now().isoformat()
+        }, expected={"content_en": article.get("content_en")}):
+            print(f"文章 {article['id']} 的原文已变化，放弃保存译文")
+            return False
+        return True
+
     @staticmethod
     def translate_article(article_id: int) -> bool:
         """步骤3: 翻译文章到中文。
@@ -83,23 +284,167 @@ class NewsPipeline:
             print(f"文章不存在: {article_id}")
             return False
 
-        translator = Translator()
+        NewsPipeline.translate_and_save(article)
+        print("翻译结果已保存")
+        return True
 
-        title_zh = translator.translate(article["title_en"])
-        print(f"标题翻译完成: {title_zh[:30]}...")
+    @staticmethod
+    @traced("pipeline.refresh_recent")
+    async def refresh_recent(days: Optional[int] = None) -> int:
+        """重新获取最近的文章，只对内容有变化的文章重新翻译变化的段落。
 
-        content_zh = ""
-        if article.get("content_en"):
-            content_zh = translator.translate(article["content_en"])
-            print(f"正文翻译完成: {len(content_zh)} 字符")
+        通过内容哈希判断是否更新。内容变化时先将translated_at和polished_at
+        置空标记为过期，再复用旧译文按段落重新翻译；润色结果保留但需重新润色。
 
-        db.update_article(article_id, {
-            "title_zh": title_zh,
+        Args:
+            days: 重新获取最近多少天内爬取的文章，默认为config中的配置。
+
+        Returns:
+            int: 内容有变化的文章数量。
+        """
+        days = days or REFRESH_CONFIG["days"]
+        print("=" * 50)
+        print(f"刷新最近 {days} 天的文章")
+        print("=" * 50)
+
+        since = (datetime.now() - timedelta(days=days)).isoformat()
+        articles = db.get_recent_articles(since)
+        semaphore = asyncio.Semaphore(REFRESH_CONFIG["concurrency"])
+        fetcher = ArticleFetcher()
+
+        async def _fetch(article: Dict) -> Optional[Dict]:
+            async with semaphore:
+                return await fetcher.fetch_content(article["url"])
+
+        results = await asyncio.gather(*[_fetch(a) for a in articles])
+
+        changed = 0
+        translator = Translator()
+        for article, result in zip(articles, results):
+            if not result or not result.get("content_en"):
+                continue
+            old_hash = article.get("content_hash") or content_hash(article["content_en"])
+            if content_hash(result["content_en"]) == old_hash:
+                continue
+
+            changed += 1
+            print(f"文章 {article['id']} 内容已更新")
+            NewsPipeline.save_content(article["id"], dict(
+                result, translated_at=None, polished_at=None
+            ))
+
+            if not article.get("content_zh"):
+                continue
+            await asyncio.to_thread(NewsPipeline._retranslate_changed, article, result, translator)
+
+        print(f"共 {len(articles)} 篇文章，{changed} 篇内容有更新")
+        return changed
+
+    @staticmethod
+    @traced("pipeline.retranslate_changed")
+    def _retranslate_changed(article: Dict, result: Dict, translator: Translator) -> None:
+        """基于旧版本译文，只重新翻译变化的段落。
+
+        Args:
+            article: 更新前的文章数据。
+            result: 重新获取到的内容。
+            translator: 翻译器实例。
+        """
+        content_zh, reused = translate_with_reuse(
+            result["content_en"],
+            [(article["content_en"], article["content_zh"])],
+            translator.translate,
+        )
+        if not content_zh:
+            # 保留旧译文，translated_at已置空，仍标记为过期
+            print(f"文章 {article['id']} 重新翻译失败，保留旧译文")
+            return
+        if not db.update_article(article["id"], {
             "content_zh": content_zh,
-            "status": "translated"
-        })
-        print("翻译结果已保存")
-        return True
+            "status": "translated",
+            "translated_at": datetime.now().isoformat()
+        }, expected={"content_en": result["content_en"]}):
+            print(f"文章 {article['id']} 的原文已再次变化，放弃保存译文")
+            return
+        print(f"文章 {article['id']} 重新翻译完成，复用 {reused} 段")
+
+    @staticmethod
+    @traced("pipeline.reextract")
+    def reextract(workers: Optional[int] = None) -> int:
+        """使用归档的HTML离线重新解析所有文章，不访问网络。
+
+        解析在进程池中并行执行；正文有变化的文章更新内容，
+        并将translated_at和polished_at置空标记为过期；
+        只有配图或发布时间变化的文章只更新这两个字段。
+
+        Args:
+            workers: 进程数，默认为config中的配置。
+
+        Returns:
+            int: 有变化的文章数量。
+        """
+        print("=" * 50)
+        print("离线重新解析归档HTML")
+        print("=" * 50)
+
+        articles = db.get_archived_articles()
+        workers = workers or ARCHIVE_CONFIG["workers"]
+
+        # 进程池模块只在离线重新解析时需要
+        from concurrent.futures import ProcessPoolExecutor
+
+        changed = 0
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                _reextract_archived, [a["html_sha"] for a in articles], chunksize=16
+            )
+            for article, result in zip(articles, results):
+                if not result:
+                    print(f"文章 {article['id']} 的归档不存在: {article['html_sha']}")
+                    continue
+                if result["content_hash"] != article["content_hash"]:
+                    changed += 1
+                    NewsPipeline.save_content(article["id"], dict(
+                        result, translated_at=None, polished_at=None
+                    ))
+                    continue
+                # 正文未变时也应用选择器调整后新解析出的配图和发布时间，未解析到的字段保留原值
+                fields = {
+                    key: result[key] for key in ("image_url", "published_at")
+                    if result[key] and result[key] != article[key]
+                }
+                if fields:
+                    changed += 1
+                    db.update_article(article["id"], fields)
+
+        print(f"共 {len(articles)} 篇归档文章，{changed} 篇有变化")
+        return changed
+
+    @staticmethod
+    @traced("pipeline.backfill_fingerprints")
+    def backfill_fingerprints() -> int:
+        """为指纹功能上线前已翻译的文章补算SimHash指纹和正文哈希，使其能被译文复用匹配。
+
+        Returns:
+            int: 补算的文章数量。
+        """
+        print("=" * 50)
+        print("补算已翻译文章的正文指纹")
+        print("=" * 50)
+
+        total = 0
+        while True:
+            articles = db.get_unfingerprinted_articles(DEDUP_CONFIG["backfill_chunk_size"])
+            if not articles:
+                break
+            db.save_fingerprints_batch([
+                (a["id"], simhash(a["content_en"]), content_hash(a["content_en"])) for a in articles
+            ])
+            total += len(articles)
+            print(f"已补算 {total} 篇")
+
+        print(f"补算完成，共 {total} 篇")
+        return total
 
     @staticmethod
     def run_full_pipeline(article_id: Optional[int] = None) -> bool:
@@ -117,7 +462,7 @@ class NewsPipeline:
         print("开始运行完整流水线")
         print("=" * 50 + "\n")
 
-        NewsPipeline.crawl_and_save()
+        asyncio.run(NewsPipeline.crawl_and_save())
 
         if article_id is None:
             articles = db.get_all_articles()
@@ -133,6 +478,99 @@ class NewsPipeline:
         print("=" * 50)
         return True
 
+    @staticmethod
+    @traced("pipeline.export_articles")
+    def export_articles(path: str, status: Optional[str] = None) -> int:
+        """将文章流式导出为NDJSON文件，.gz结尾时使用gzip压缩。
+
+        Args:
+            path: 输出文件路径。
+            status: 可选，按状态筛选。
+
+        Returns:
+            int: 导出的文章数量。
+        """
+        count = 0
+
+        def _counted():
+            nonlocal count
+            for article in db.iter_articles(status=status):
+                count += 1
+                yield article
+
+        with open(path, "wb") as f:
+            for chunk in encode_ndjson(_counted(), compress=str(path).endswith(".gz")):
+                f.write(chunk)
+        print(f"已导出 {count} 篇文章到 {path}")
+        return count
+
+    @staticmethod
+    @traced("pipeline.import_articles")
+    def import_articles(path: str) -> int:
+        """从NDJSON文件（可为.gz）分批导入文章，已存在的url会被跳过。
+
+        无法解析或缺少title_en、url的记录无法导入，逐条打印文件行号后跳过，计入无效记录。
+
+        Args:
+            path: 由/api/export或export命令生成的文件。
+
+        Returns:
+            int: 新增的文章数量。
+        """
+        chunk_size = EXPORT_CONFIG["import_chunk_size"]
+        total = added = invalid = 0
+        chunk: List[Dict] = []
+        for line_number, article in read_ndjson(path):
+            if article is None:
+                invalid += 1
+                continue
+            article.pop("id", None)
+            missing = [field for field in ("title_en", "url") if not article.get(field)]
+            if missing:
+                invalid += 1
+                print(f"第 {line_number} 行缺少 {', '.join(missing)}，已跳过")
+                continue
+            chunk.append(article)
+            if len(chunk) >= chunk_size:
+                added += db.import_articles_batch(chunk)
+                total += len(chunk)
+                chunk = []
+                print(f"已读取 {total} 篇，新增 {added} 篇")
+        if chunk:
+            added += db.import_articles_batch(chunk)
+            total += len(chunk)
+
+        print(
+            f"导入完成：读取 {total + invalid} 篇，新增 {added} 篇，"
+            f"跳过 {total - added} 篇已存在的文章和 {invalid} 条无效记录"
+        )
+        return added
+
+    @staticmethod
+    def routing_stats(days: int = 7) -> List[Dict]:
+        """打印最近若干天各任务、各模型的调用次数、延迟和费用，用于调整LLM_ROUTING。
+
+        Args:
+            days: 统计最近多少天的调用。
+
+        Returns:
+            List[Dict]: 按(task, model)汇总的统计结果。
+        """
+        since = (datetime.now() - timedelta(days=days)).isoformat()
+        stats = db.get_llm_call_stats(since)
+        print(f"最近 {days} 天大模型调用统计:")
+        for row in stats:
+            print(
+                f"  {row['task']:<8}{row['model']:<16}"
+                f"调用 {row['calls']} 次，失败 {row['errors']} 次，"
+                f"平均输入 {row['avg_input_chars'] or 0:.0f} 字符，"
+                f"前缀缓存 {(row['cached_ratio'] or 0) * 100:.0f}%，"
+                f"平均首字 {row['avg_ttft_ms'] or 0:.0f}ms，"
+                f"平均耗时 {row['avg_latency_ms'] or 0:.0f}ms，"
+                f"费用 {row['total_cost'] or 0:.4f} 元"
+            )
+        return stats
+
 
 def main():
     """命令行入口。"""
@@ -143,22 +581,48 @@ def main():
         print("  python -m src.pipeline crawl          # 爬取新闻")
         print("  python -m src.pipeline fetch <id>    # 获取文章内容")
         print("  python -m src.pipeline translate <id> # 翻译文章")
+        print("  python -m src.pipeline refresh [days] # 重新获取最近文章，仅重译变化段落")
+        print("  python -m src.pipeline reextract [n]  # 用归档HTML离线重新解析（n个进程）")
+        print("  python -m src.pipeline backfill-fingerprints # 为已翻译的旧文章补算正文指纹")
         print("  python -m src.pipeline run            # 运行完整流水线")
+        print("  python -m src.pipeline routing-stats [days] # 按任务和模型汇总大模型调用")
+        print("  python -m src.pipeline export <file> [status] # 导出为NDJSON（.gz结尾时压缩）")
+        print("  python -m src.pipeline import <file>  # 从NDJSON（可为.gz）批量导入")
         return
 
     action = sys.argv[1]
-    pipeline = NewsPipeline()
+    with span(f"cli.{action}", argv=sys.argv[2:]):
+        _run_action(NewsPipeline(), action, sys.argv)
+
 
+def _run_action(pipeline: NewsPipeline, action: str, argv: List[str]) -> None:
+    """执行命令行操作。"""
     if action == "crawl":
         asyncio.run(pipeline.crawl_and_save())
     elif action == "fetch":
-        article_id = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+        article_id = int(argv[2]) if len(argv) > 2 else 1
         pipeline.fetch_article_content(article_id)
     elif action == "translate":
-        article_id = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+        article_id = int(argv[2]) if len(argv) > 2 else 1
         pipeline.translate_article(article_id)
+    elif action == "refresh":
+        days = int(argv[2]) if len(argv) > 2 else None
+        asyncio.run(pipeline.refresh_recent(days))
+    elif action == "reextract":
+        workers = int(argv[2]) if len(argv) > 2 else None
+        pipeline.reextract(workers)
+    elif action == "backfill-fingerprints":
+        pipeline.backfill_fingerprints()
     elif action == "run":
         pipeline.run_full_pipeline()
+    elif action == "routing-stats":
+        days = int(argv[2]) if len(argv) > 2 else 7
+        pipeline.routing_stats(days)
+    elif action == "export":
+        status = argv[3] if len(argv) > 3 else None
+        pipeline.export_articles(argv[2], status)
+    elif action == "import":
+        pipeline.import_articles(argv[2])
     else:
         print(f"未知操作: {action}")
 
@@ -0,0 +1,211 @@
+"""优先级调度模块。
+
+浏览器会话、各模型的大模型并发等共享资源由PriorityLimiter按通道分配：
+interactive通道（API中编辑手动触发的操作）优先获得空闲名额，并保留一部分名额，
+bulk通道（命令行流水线、批量任务）最多只能占用剩余名额，
+因此批量回填运行期间单篇文章的操作不必排在大量批量任务之后。
+当前通道通过contextvars传递，同一请求内的asyncio任务和复制上下文的线程会自动继承。
+通道可以在排队期间提升：bulk任务被interactive调用合并等待时，排队中的名额请求改按interactive处理。
+"""
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Union
+
+from config.config import SCHEDULER_CONFIG
+from src.metrics import QUEUE_DEPTH, SCHEDULER_WAIT_SECONDS
+from src.tracing import current_span
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+LANES = (INTERACTIVE, BULK)
+
+
+class LaneRef:
+    """可在执行中提升优先级的调度通道。
+
+    同一上下文（及复制该上下文的线程、asyncio任务）共享同一个LaneRef，
+    提升后正在排队和之后申请的名额都按新通道分配。
+    """
+
+    def __init__(self, name: str):
+        if name not in LANES:
+            raise ValueError(f"未知的调度通道: {name}")
+        self.name = name
+
+    def promote(self, name: str) -> None:
+        """将通道提升到name（只升不降），并唤醒正在排队的名额请求重新判断。"""
+        if LANES.index(name) >= LANES.index(self.name):
+            return
+        self.name = name
+        for limiter in list(_limiters):
+            limiter.wake()
+
+
+# 未显式设置时按批量任务处理，只有API请求会切换到interactive
+_current_lane: ContextVar[Optional[LaneRef]] = ContextVar("scheduler_lane", default=None)
+
+
+def current_lane() -> str:
+    """返回当前上下文的调度通道。"""
+    ref = _current_lane.get()
+    return ref.name if ref is not None else BULK
+
+
+def current_lane_ref() -> LaneRef:
+    """返回当前上下文的通道引用，未设置时返回新的bulk引用。"""
+    return _current_lane.get() or LaneRef(BULK)
+
+
+def set_lane(name: Union[str, LaneRef]):
+    """设置当前上下文的调度通道，返回用于恢复的token（供Flask请求钩子使用）。"""
+    return _current_lane.set(name if isinstance(name, LaneRef) else LaneRef(name))
+
+
+def reset_lane(token) -> None:
+    """恢复set_lane之前的调度通道。"""
+    _current_lane.reset(token)
+
+
+@contextmanager
+def lane(name: Union[str, LaneRef]):
+    """在代码块内使用指定的调度通道。"""
+    token = set_lane(name)
+    try:
+        yield
+    finally:
+        reset_lane(token)
+
+
+class PriorityLimiter:
+    """按通道优先级分配固定数量名额的并发限制器。"""
+
+    def __init__(self, resource: str, capacity: int, reserved_interactive: int):
+        """初始化限制器。
+
+        Args:
+            resource: 资源名称，用于指标标签，如browser、llm:qwen3-max。
+            capacity: 总名额数。
+            reserved_interactive: 为interactive通道保留的名额数，bulk通道不能占用。
+        """
+        if capacity < 1 or not 0 <= reserved_interactive < capacity:
+            raise ValueError(f"{resource}: 需要 capacity >= 1 且 0 <= reserved_interactive < capacity")
+        self.resource = resource
+        self.capacity = capacity
+        self.reserved_interactive = reserved_interactive
+        self._cond = threading.Condition()
+        self._in_use = {name: 0 for name in LANES}
+        self._waiting = {name: 0 for name in LANES}
+        _limiters.append(self)
+
+    def _can_grant(self, name: str) -> bool:
+        """判断是否可以为该通道分配名额（需持有_cond）。"""
+        if sum(self._in_use.values()) >= self.capacity:
+            return False
+        if name == INTERACTIVE:
+            return True
+        # interactive有人排队时bulk让行，且bulk不能占用保留名额
+        return (
+            self._waiting[INTERACTIVE] == 0
+            and self._in_use[BULK] < self.capacity - self.reserved_interactive
+        )
+
+    def _set_waiting(self, name: str, delta: int) -> None:
+        """调整某通道的排队数并更新指标（需持有_cond）。"""
+        self._waiting[name] += delta
+        QUEUE_DEPTH.set(self._waiting[name], queue=self.resource, state=f"{name}_waiting")
+
+    def acquire(self, ref: LaneRef) -> str:
+        """阻塞直到获得名额，排队期间ref被提升时改按新通道排队。
+
+        Args:
+            ref: 调度通道引用。
+
+        Returns:
+            str: 实际获得名额的通道，归还时传给release。
+        """
+        start = time.perf_counter()
+        with self._cond:
+            name = ref.name
+            self._set_waiting(name, 1)
+            try:
+                while True:
+                    if ref.name != name:
+                        self._set_waiting(name, -1)
+                        name = ref.name
+                        self._set_waiting(name, 1)
+                    if self._can_grant(name):
+                        break
+                    self._cond.wait()
+            finally:
+                self._set_waiting(name, -1)
+            self._in_use[name] += 1
+            QUEUE_DEPTH.set(self._in_use[name], queue=self.resource, state=f"{name}_running")
+
+        waited = time.perf_counter() - start
+        SCHEDULER_WAIT_SECONDS.observe(waited, resource=self.resource, lane=name)
+        span = current_span()
+        if span is not None:
+            span.set(**{f"wait_{self.resource}_ms": round(waited * 1000, 3)})
+        return name
+
+    def wake(self) -> None:
+        """唤醒排队者重新判断（通道提升后调用）。"""
+        with self._cond:
+            self._cond.notify_all()
+
+    def release(self, name: str) -> None:
+        """归还名额并唤醒排队者。"""
+        with self._cond:
+            self._in_use[name] -= 1
+            QUEUE_DEPTH.set(self._in_use[name], queue=self.resource, state=f"{name}_running")
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """在当前通道占用一个名额执行代码块。"""
+        name = self.acquire(current_lane_ref())
+        try:
+            yield
+        finally:
+            self.release(name)
+
+    @asynccontextmanager
+    async def async_slot(self):
+        """slot的协程版本，在线程中排队，不阻塞事件循环。"""
+        waiter = asyncio.ensure_future(asyncio.to_thread(self.acquire, current_lane_ref()))
+        try:
+            name = await asyncio.shield(waiter)
+        except asyncio.CancelledError:
+            # 取消时名额可能已在线程中分配，等分配完成后立即归还
+            waiter.add_done_callback(lambda f: f.cancelled() or f.exception() or self.release(f.result()))
+            raise
+        try:
+            yield
+        finally:
+            self.release(name)
+
+
+def _create(resource: str, config: Dict) -> PriorityLimiter:
+    return PriorityLimiter(resource, config["capacity"], config["reserved_interactive"])
+
+
+# 所有限制器，通道提升时逐个唤醒
+_limiters: List[PriorityLimiter] = []
+
+browser_limiter = _create("browser", SCHEDULER_CONFIG["browser"])
+
+_llm_limiters: Dict[str, PriorityLimiter] = {}
+_llm_lock = threading.Lock()
+
+
+def llm_limiter(model: str) -> PriorityLimiter:
+    """返回指定模型的并发限制器，未单独配置的模型使用默认配置。"""
+    with _llm_lock:
+        limiter = _llm_limiters.get(model)
+        if limiter is None:
+            config = SCHEDULER_CONFIG["llm"].get(model, SCHEDULER_CONFIG["llm"]["default"])
+            limiter = _llm_limiters[model] = _create(f"llm:{model}", config)
+        return limiter
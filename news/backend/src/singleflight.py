@@ -0,0 +1,106 @@
+"""进行中任务合并模块。
+
+同一个键（操作、文章ID、输入内容哈希）的任务同时只执行一次，
+并发的调用方等待并共享同一个结果，避免重复的浏览器抓取和大模型调用。
+执行中的调用按等待者中最高的调度通道排队：interactive请求合并到bulk任务上时，
+该任务后续申请的浏览器和大模型名额改按interactive分配。调用沿用调用方的通道引用，
+嵌套的合并调用（如fetch-and-translate中的fetch和translate）与外层共享同一个引用，一起提升。
+"""
+import functools
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from src.metrics import CACHE_EVENTS_TOTAL
+from src.scheduler import LaneRef, current_lane, current_lane_ref, lane
+from src.tracing import current_span
+
+
+class _Call:
+    """一次进行中的调用。"""
+
+    def __init__(self, lane_ref: LaneRef):
+        self.lane = lane_ref
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """按键合并并发调用。"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """执行fn；如果相同键的调用正在进行，则等待并返回它的结果。
+
+        Args:
+            key: 调用键。
+            fn: 无参函数。
+
+        Returns:
+            Tuple[Any, bool]: (结果, 是否共享了其他调用的结果)。
+
+        Raises:
+            Exception: fn抛出的异常，会传递给所有等待的调用方。
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call(current_lane_ref())
+
+        if not leader:
+            call.lane.promote(current_lane())
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            with lane(call.lane):
+                call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+_inflight = SingleFlight()
+
+
+def digest(*parts: str) -> str:
+    """计算输入内容的短哈希，作为调用键的一部分。"""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update((part or "").encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()[:16]
+
+
+def coalesced(operation: str, key_fn: Callable[..., Tuple]):
+    """合并相同输入的并发调用的装饰器。
+
+    Args:
+        operation: 操作名称，如fetch、translate、polish。
+        key_fn: 接收被装饰函数的参数，返回(文章ID, 输入哈希, ...)。
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (operation,) + tuple(key_fn(*args, **kwargs))
+            result, shared = _inflight.do(key, lambda: func(*args, **kwargs))
+            CACHE_EVENTS_TOTAL.inc(cache="singleflight", result="hit" if shared else "miss")
+            if shared:
+                span = current_span()
+                if span is not None:
+                    span.set(singleflight_shared=operation)
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,206 @@
+"""请求追踪模块。
+
+轻量级的嵌套span追踪：每个请求（或命令行任务）生成一个trace，各阶段记录为子span。
+总耗时超过阈值的trace以结构化JSON写入日志，并可通过导出钩子发送到本地采集器。
+使用contextvars传递当前span，同一请求内的asyncio任务会自动继承。
+"""
+import functools
+import inspect
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from config.config import TRACING_CONFIG
+from src.logger import get_logger
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+_exporters: List[Callable[[Dict], None]] = []
+
+
+class Span:
+    """单个追踪片段，记录名称、耗时、属性和子片段。"""
+
+    def __init__(self, name: str, trace_id: str, parent: Optional["Span"] = None, **attrs):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent = parent
+        self.attrs = attrs
+        self.children: List[Span] = []
+        self.started_at = datetime.now().isoformat()
+        self.error: Optional[str] = None
+        self.duration_ms: Optional[float] = None
+        self._start = time.perf_counter()
+        # 整个trace共享的span计数，避免长任务生成过大的span树
+        self._count = parent._count if parent else [1]
+
+    def set(self, **attrs) -> None:
+        """补充span属性，如token数、结果状态等。"""
+        self.attrs.update(attrs)
+
+    def finish(self) -> None:
+        self.duration_ms = round((time.perf_counter() - self._start) * 1000, 3)
+
+    def to_dict(self) -> Dict:
+        """转换为嵌套字典。"""
+        data = {
+            "name": self.name,
+            "span_id": self.span_id,
+            "started_at": self.started_at,
+            "duration_ms": self.duration_ms,
+        }
+        if self.attrs:
+            data["attrs"] = self.attrs
+        if self.error:
+            data["error"] = self.error
+        if self.children:
+            data["children"] = [child.to_dict() for child in self.children]
+        return data
+
+
+def current_span() -> Optional[Span]:
+    """返回当前上下文中的span，没有则返回None。"""
+    return _current_span.get()
+
+
+def begin_span(name: str, trace_id: Optional[str] = None, child_only: bool = False, **attrs):
+    """开始一个span，供无法使用with语句的场景（如Flask请求钩子）调用。
+
+    Args:
+        name: span名称。
+        trace_id: 可选，新建trace时使用的ID（如请求头传入的ID）。
+        child_only: 为True时仅在已有trace中创建子span，否则不记录。
+        **attrs: span属性。
+
+    Returns:
+        tuple: (span, token)，span可能为None；结束时传给end_span。
+    """
+    if not TRACING_CONFIG["enabled"]:
+        return None, None
+
+    parent = _current_span.get()
+    if parent is None:
+        if child_only:
+            return None, None
+        new_span = Span(name, trace_id or uuid.uuid4().hex, **attrs)
+    else:
+        if parent._count[0] >= TRACING_CONFIG["max_spans"]:
+            return None, None
+        parent._count[0] += 1
+        new_span = Span(name, parent.trace_id, parent, **attrs)
+        parent.children.append(new_span)
+    return new_span, _current_span.set(new_span)
+
+
+def end_span(current: Optional[Span], token, error: Optional[BaseException] = None) -> None:
+    """结束begin_span开始的span；根span结束时检查慢请求阈值。"""
+    if current is None:
+        return
+    current.finish()
+    if error is not None:
+        current.error = f"{type(error).__name__}: {error}"
+    try:
+        _current_span.reset(token)
+    except ValueError:
+        # token来自其他上下文（如跨线程结束），只能直接恢复父span
+        _current_span.set(current.parent)
+    if current.parent is None:
+        _finish_trace(current)
+
+
+@contextmanager
+def span(name: str, child_only: bool = False, **attrs):
+    """记录代码块为一个span。
+
+    Args:
+        name: span名称，如pipeline.translate、db.get_article_by_id。
+        child_only: 为True时仅在已有trace中记录（用于数据库等底层调用）。
+        **attrs: span属性。
+
+    Yields:
+        Optional[Span]: 当前span，可调用set补充属性；未记录时为None。
+    """
+    current, token = begin_span(name, child_only=child_only, **attrs)
+    try:
+        yield current
+    except BaseException as e:
+        end_span(current, token, e)
+        raise
+    else:
+        end_span(current, token)
+
+
+def traced(name: str):
+    """将函数调用记录为span的装饰器，支持普通函数和协程函数。
+
+    Args:
+        name: span名称。
+    """
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def add_exporter(exporter: Callable[[Dict], None]) -> None:
+    """注册导出钩子，每个超过阈值的trace都会以字典形式传给它。"""
+    _exporters.append(exporter)
+
+
+def _finish_trace(root: Span) -> None:
+    """根span结束：超过慢请求阈值时记录日志并调用导出钩子。
+
+    根span的wait_ms属性（如长轮询的主动等待时间）不计入慢请求判断。
+    """
+    if root.duration_ms - root.attrs.get("wait_ms", 0) < TRACING_CONFIG["slow_request_ms"]:
+        return
+
+    # 日志在首次写入慢trace时才配置，导入本模块不会创建日志文件
+    logger = get_logger("trace")
+    trace = {"trace_id": root.trace_id, "duration_ms": root.duration_ms, "root": root.to_dict()}
+    logger.warning(json.dumps({"event": "slow_trace", **trace}, ensure_ascii=False))
+
+    for exporter in _exporters:
+        try:
+            exporter(trace)
+        except Exception as e:
+            logger.error(f"trace导出失败: {e}")
+
+
+def _http_exporter(url: str) -> Callable[[Dict], None]:
+    """将trace以JSON POST到本地采集器，在后台线程发送，不阻塞请求。"""
+    def _export(trace: Dict) -> None:
+        def _send():
+            # urllib.request会连带导入ssl等模块，只在实际发送时加载
+            import urllib.request
+
+            try:
+                request = urllib.request.Request(
+                    url,
+                    data=json.dumps(trace, ensure_ascii=False).encode("utf-8"),
+                    headers={"Content-Type": "application/json"},
+                )
+                urllib.request.urlopen(request, timeout=5).close()
+            except Exception as e:
+                get_logger("trace").error(f"trace发送到 {url} 失败: {e}")
+        threading.Thread(target=_send, daemon=True).start()
+    return _export
+
+
+if TRACING_CONFIG["export_url"]:
+    add_exporter(_http_exporter(TRACING_CONFIG["export_url"]))
@@ -0,0 +1,68 @@
+"""进行中任务合并与通道提升的测试。
+
+在backend目录下运行: python -m pytest tests 或 python -m unittest discover tests
+"""
+import threading
+import time
+import unittest
+
+from src.scheduler import BULK, INTERACTIVE, PriorityLimiter, current_lane, lane
+from src.singleflight import SingleFlight
+
+
+class NestedPromotionTest(unittest.TestCase):
+    """interactive调用方合并到bulk任务上时，嵌套调用申请的名额也要按interactive分配。"""
+
+    def test_interactive_follower_promotes_nested_call(self):
+        limiter = PriorityLimiter("test", capacity=2, reserved_interactive=1)
+        flights = SingleFlight()
+        granted = []
+        release_holder = threading.Event()
+
+        # bulk名额（2-1=1个）被占满，之后的bulk申请只能排队
+        def hold_bulk_slot():
+            with lane(BULK), limiter.slot():
+                release_holder.wait(5)
+
+        def inner():
+            with limiter.slot():
+                granted.append(current_lane())
+            return "inner"
+
+        def outer():
+            return flights.do("inner", inner)[0]
+
+        def bulk_leader():
+            with lane(BULK):
+                flights.do("outer", outer)
+
+        holder = threading.Thread(target=hold_bulk_slot)
+        holder.start()
+        time.sleep(0.05)
+        leader = threading.Thread(target=bulk_leader)
+        leader.start()
+        time.sleep(0.1)
+        self.assertEqual(granted, [], "bulk名额已满时嵌套调用应在排队")
+
+        results = []
+
+        def interactive_follower():
+            with lane(INTERACTIVE):
+                results.append(flights.do("outer", outer))
+
+        start = time.perf_counter()
+        follower = threading.Thread(target=interactive_follower)
+        follower.start()
+        follower.join(2)
+        waited = time.perf_counter() - start
+        release_holder.set()
+        leader.join(2)
+        holder.join(2)
+
+        self.assertEqual(results, [("inner", True)])
+        self.assertEqual(granted, [INTERACTIVE])
+        self.assertLess(waited, 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -32,5 +32,28 @@ export default {
   
   polish(id) {
     return api.post(`/articles/${id}/polish`)
+  },
+
+  // operation: fetch / translate / fetch-and-translate / polish
+  // payload: { ids: [...] } 或 { status, limit }
+  submitBatch(operation, payload) {
+    return api.post(`/articles/batch/${operation}`, payload)
+  },
+
+  getBatchJob(jobId) {
+    return api.get(`/articles/batch/jobs/${jobId}`)
+  },
+
+  // 文章配图的本地缓存地址，variant: thumb（列表缩略图）/ detail（详情图）
+  imageUrl(id, variant = 'thumb') {
+    return `/api/images/${id}?variant=${variant}`
+  },
+
+  // 增量获取 cursor 之后更新的文章（不含正文），wait 秒内没有变更时服务端挂起等待
+  getChanges(since, wait = 0) {
+    return api.get('/articles/changes', {
+      params: { since, wait },
+      timeout: (wait + 30) * 1000
+    })
   }
 }